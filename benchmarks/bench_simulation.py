@@ -0,0 +1,216 @@
+"""
+Simulation benchmark suite.
+
+Times Simulation.step, Grid.random_populate, Grid.get_population_stats and
+Simulation.get_statistics across grid sizes, fill ratios and every scenario in
+game/patterns.py. Steps are timed in batches of STEPS_PER_BATCH generations,
+each from a freshly seeded world, so every case measures the density it names
+rather than whatever the world has settled into. Statistics are timed cold
+(recounted from the grid) and cached. Steps are timed with rewind history
+off, and again with the default configuration for each fill ratio. Results are reported as generations/sec
+and cells/sec and saved as JSON; pass an earlier results file with --compare
+to flag regressions.
+
+Example:
+    python -m benchmarks.bench_simulation --output bench.json
+    python -m benchmarks.bench_simulation --compare bench.json --output bench_new.json
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from utils.config import Config
+from game.grid import Grid
+from game.simulation import Simulation
+from game.patterns import SCENARIOS, apply_scenario
+
+
+SIZES = [(100, 80), (500, 500), (1000, 1000), (2000, 2000)]
+QUICK_SIZES = [(100, 80), (500, 500)]
+
+# Total occupied share of the grid, split between types like the default population
+FILL_RATIOS = [0.05, 0.23, 0.5]
+DEFAULT_SPLIT = (0.1, 0.05, 0.05, 0.03)
+
+# Generations timed from each freshly built world
+STEPS_PER_BATCH = 5
+
+
+def population_ratios(fill):
+    """Scale the default human/vampire/forest/bunker split to a total fill ratio"""
+    total = sum(DEFAULT_SPLIT)
+    return tuple(share * fill / total for share in DEFAULT_SPLIT)
+
+
+def time_call(function, min_time, max_repeats):
+    """Average seconds per call, repeating until min_time has elapsed"""
+    function()  # Warm-up
+    repeats = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while repeats < max_repeats and (repeats == 0 or elapsed < min_time):
+        function()
+        repeats += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / repeats, repeats
+
+
+def time_steps(build, min_time, max_repeats):
+    """Average seconds per generation over batches of STEPS_PER_BATCH steps, each from a world made by build()
+
+    Worlds are built and closed outside the timed region; repeats counts batches.
+    """
+    elapsed = 0.0
+    repeats = 0
+    while repeats < max_repeats and (repeats == 0 or elapsed < min_time):
+        grid, simulation = build()
+        start = time.perf_counter()
+        for _ in range(STEPS_PER_BATCH):
+            simulation.step()
+        elapsed += time.perf_counter() - start
+        simulation.close()
+        repeats += 1
+    return elapsed / (repeats * STEPS_PER_BATCH), repeats
+
+
+def make_world(width, height, engine, fill=None, scenario=None, seed=1, defaults=False):
+    config = Config()
+    config.GRID_WIDTH = width
+    config.GRID_HEIGHT = height
+    if not defaults:
+        config.HISTORY_MEMORY_LIMIT = 0  # Time the engines, not rewind recording
+    random.seed(seed)
+    grid = Grid(config)
+    if scenario is not None:
+        apply_scenario(grid, scenario)
+    else:
+        grid.random_populate(*population_ratios(fill))
+    return grid, Simulation(grid, config, engine=engine)
+
+
+def record(results, name, case, seconds, repeats, cells):
+    """Store one timing; steps are rated in generations/sec, everything else in calls/sec"""
+    rate_key = "generations_per_sec" if name.startswith("step/") else "calls_per_sec"
+    results.append({
+        "name": name,
+        "case": case,
+        "seconds": seconds,
+        "repeats": repeats,
+        rate_key: 1.0 / seconds,
+        "cells_per_sec": cells / seconds
+    })
+    unit = "gen/s" if rate_key == "generations_per_sec" else "calls/s"
+    print(f"{name:<58}{seconds * 1000:>10.3f} ms{1.0 / seconds:>12.1f} {unit:<8}{cells / seconds:>12.3e} cells/s")
+
+
+def run_suite(sizes, engines, min_time, max_repeats):
+    results = []
+    for width, height in sizes:
+        cells = width * height
+        size = f"{width}x{height}"
+
+        for fill in FILL_RATIOS:
+            case = {"width": width, "height": height, "fill": fill}
+            grid, simulation = make_world(width, height, engines[0], fill=fill)
+
+            seconds, repeats = time_call(lambda: grid.random_populate(*population_ratios(fill)), min_time, 3)
+            record(results, f"random_populate/{size}/fill={fill}", case, seconds, repeats, cells)
+            # Cold timings drop the incremental counts first, as a whole-grid step does
+            for name, function in (("get_population_stats", grid.get_population_stats),
+                                   ("get_statistics", simulation.get_statistics)):
+                seconds, repeats = time_call(lambda: (grid.population.invalidate(), function()),
+                                             min_time, max_repeats)
+                record(results, f"{name}/{size}/fill={fill}", case, seconds, repeats, cells)
+                seconds, repeats = time_call(function, min_time, max_repeats)
+                record(results, f"{name}/cached/{size}/fill={fill}", case, seconds, repeats, cells)
+            simulation.close()
+
+            for engine in engines:
+                seconds, repeats = time_steps(lambda: make_world(width, height, engine, fill=fill),
+                                              min_time, max_repeats)
+                record(results, f"step/{engine}/{size}/fill={fill}", dict(case, engine=engine),
+                       seconds, repeats, cells)
+                # The same steps with rewind history recorded, as the default configuration does
+                seconds, repeats = time_steps(lambda: make_world(width, height, engine, fill=fill, defaults=True),
+                                              min_time, max_repeats)
+                record(results, f"step/{engine}/{size}/fill={fill}/defaults", dict(case, engine=engine, defaults=True),
+                       seconds, repeats, cells)
+
+        for scenario in sorted(SCENARIOS):
+            case = {"width": width, "height": height, "scenario": scenario}
+            for engine in engines:
+                seconds, repeats = time_steps(lambda: make_world(width, height, engine, scenario=scenario),
+                                              min_time, max_repeats)
+                record(results, f"step/{engine}/{size}/{scenario}", dict(case, engine=engine),
+                       seconds, repeats, cells)
+    return results
+
+
+def compare(results, baseline_path, tolerance):
+    """Print the change against an earlier results file and return the regressed benchmark names"""
+    with open(baseline_path) as f:
+        baseline = {entry["name"]: entry for entry in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%}):")
+    for entry in results:
+        previous = baseline.get(entry["name"])
+        if previous is None:
+            continue
+        change = entry["seconds"] / previous["seconds"] - 1
+        marker = ""
+        if change > tolerance:
+            marker = "  REGRESSION"
+            regressions.append(entry["name"])
+        print(f"{entry['name']:<58}{change:>+9.1%}{marker}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the simulation across sizes, densities and scenarios")
+    parser.add_argument("--quick", action="store_true", help="only run the two smallest grid sizes")
+    parser.add_argument("--engines", nargs="+", choices=Simulation.ENGINES, default=["numpy"],
+                        help="stepping engines to time (python is only practical on small grids)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="minimum seconds spent per benchmark")
+    parser.add_argument("--max-repeats", type=int, default=200, help="maximum timed calls (or step batches) per benchmark")
+    parser.add_argument("--output", default=None, help="write results to this JSON file")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="slowdown fraction reported as a regression")
+    args = parser.parse_args(argv)
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    results = run_suite(sizes, args.engines, args.min_time, args.max_repeats)
+
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "processor": platform.processor(),
+                "engines": args.engines
+            },
+            "results": results
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import numpy as np
+from game.entities import Cell
+from game.rule_table import RuleTables
+
+
+class ArrayEngine:
+    """Vectorized stepping engine applying the simulation rules to [x][y] indexed NumPy arrays"""
+
+    # Cells of context needed around a region so its neighbour counts are exact
+    WINDOW_MARGIN = 2
+
+    def __init__(self, config, rule_tables=None):
+        self.config = config
+        self.rule_tables = rule_tables or RuleTables(config)
+
+    @staticmethod
+    def count_neighbors(cell_types, cell_type):
+        """Count neighbors of the given type around every cell, wrapping at the edges"""
+        mask = (cell_types == cell_type).astype(np.uint8)
+
+        # Separable 3x3 box sum on the torus, minus the centre cell
+        rows = mask + np.roll(mask, 1, axis=0) + np.roll(mask, -1, axis=0)
+        box = rows + np.roll(rows, 1, axis=1) + np.roll(rows, -1, axis=1)
+        return box - mask
+
+    @staticmethod
+    def count_window_neighbors(windows, cell_type):
+        """Count neighbors of the given type for the interior of a batch of (k, n, n) windows"""
+        mask = (windows == cell_type).astype(np.uint8)
+
+        rows = mask[:, :-2] + mask[:, 1:-1] + mask[:, 2:]
+        box = rows[:, :, :-2] + rows[:, :, 1:-1] + rows[:, :, 2:]
+        return box - mask[:, 1:-1, 1:-1]
+
+    @staticmethod
+    def count_strip_neighbors(window, cell_type):
+        """Count neighbors of the given type for a strip of rows given with one halo row on each side"""
+        mask = (window == cell_type).astype(np.uint8)
+
+        # Rows come from the halo, columns wrap around the torus
+        rows = mask[:-2] + mask[1:-1] + mask[2:]
+        box = rows + np.roll(rows, 1, axis=1) + np.roll(rows, -1, axis=1)
+        return box - mask[1:-1]
+
+    def step(self, cell_types, ages, hunger, is_day, windows=None, out=None):
+        """Compute the next generation, returning new (cell_types, ages, hunger) arrays
+
+        windows optionally restricts rule evaluation to a batch of wrapped (xs, ys)
+        index arrays of shape (k, n) that include WINDOW_MARGIN cells of context;
+        every other cell keeps its type and is only aged. out optionally gives
+        three arrays, distinct from the inputs, to write the generation into.
+        """
+        next_types = None if out is None else out[0]
+        if windows is None:
+            human_neighbors = self.count_neighbors(cell_types, Cell.HUMAN)
+            vampire_neighbors = self.count_neighbors(cell_types, Cell.VAMPIRE)
+            next_types, fed_hunger = self.next_states(
+                cell_types, ages, hunger, human_neighbors, vampire_neighbors, is_day, next_types)
+        else:
+            xs, ys = windows
+            window_types = cell_types[xs[:, :, None], ys[:, None, :]]
+            human_neighbors = self.count_window_neighbors(window_types, Cell.HUMAN)
+            vampire_neighbors = self.count_window_neighbors(window_types, Cell.VAMPIRE)
+
+            # Evaluate the window interiors and scatter them back; overlapping windows agree
+            interior = (xs[:, 1:-1, None], ys[:, None, 1:-1])
+            region_types, region_hunger = self.next_states(
+                window_types[:, 1:-1, 1:-1], ages[interior], hunger[interior],
+                human_neighbors, vampire_neighbors, is_day)
+            if next_types is None:
+                next_types = cell_types.copy()
+            else:
+                np.copyto(next_types, cell_types)
+            next_types[interior] = region_types
+            fed_hunger = hunger.copy()
+            fed_hunger[interior] = region_hunger
+
+        return self.apply(cell_types, ages, fed_hunger, next_types, out)
+
+    def next_states(self, cell_types, ages, hunger, human_neighbors, vampire_neighbors, is_day, out=None):
+        """Apply the day/night ruleset, returning next types (optionally written to out) and hunger after feeding"""
+        table = self.rule_tables.get(is_day)
+        next_types = table.next_states(cell_types, human_neighbors, vampire_neighbors, ages, hunger, out)
+
+        # Vampires next to a human feed, which resets their hunger
+        fed = (cell_types == Cell.VAMPIRE) & (human_neighbors > 0)
+        return next_types, np.where(fed, 0, hunger)
+
+    def apply(self, cell_types, ages, hunger, next_types, out=None):
+        """Age every cell into the new generation, returning (next_types, ages, hunger)
+
+        With out, the results are written into its three arrays; next_types may
+        already be out's type array.
+        """
+        if out is None:
+            out = (next_types, np.empty_like(ages), np.empty_like(hunger))
+        elif next_types is not out[0]:
+            np.copyto(out[0], next_types)
+        next_types, next_ages, next_hunger = out
+
+        # Ages restart on type change, grow while unchanged, and are zero for empty cells
+        growing = (next_types == cell_types) & (next_types != Cell.EMPTY)
+        np.add(ages, ages < np.iinfo(ages.dtype).max, out=next_ages)
+        next_ages *= growing
+
+        # Surviving vampires get hungrier, everything else starts from zero
+        survivors = (cell_types == Cell.VAMPIRE) & (next_types == Cell.VAMPIRE)
+        np.add(hunger, hunger < np.iinfo(hunger.dtype).max, out=next_hunger)
+        next_hunger *= survivors
+
+        return next_types, next_ages, next_hunger
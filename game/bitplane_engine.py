@@ -0,0 +1,409 @@
+import hashlib
+import struct
+import zlib
+import numpy as np
+from game.array_engine import ArrayEngine
+from game.entities import Cell
+
+
+WORD_BITS = 64
+ONE = np.uint64(1)
+# Type planes in BitPlaneState.planes, in this order
+PLANE_TYPES = (Cell.HUMAN, Cell.VAMPIRE, Cell.FOREST, Cell.BUNKER)
+
+
+def pack(mask):
+    """Pack a (width, height) boolean array into (width, words) uint64 rows, bit y of a row is cell y"""
+    width, height = mask.shape
+    words = -(-height // WORD_BITS)
+    packed = np.zeros((width, words * 8), dtype=np.uint8)
+    packed[:, :-(-height // 8)] = np.packbits(mask, axis=1, bitorder="little")
+    return packed.view("<u8").astype(np.uint64, copy=False)
+
+
+def unpack(plane, height):
+    """Unpack (width, words) uint64 rows into a (width, height) boolean array"""
+    as_bytes = np.ascontiguousarray(plane, dtype="<u8").view(np.uint8)
+    return np.unpackbits(as_bytes, axis=1, count=height, bitorder="little").astype(bool)
+
+
+class BitPlaneState:
+    """One packed generation: type occupancy planes plus saturating age and hunger counter planes
+
+    Counters are bit-sliced (plane i holds bit i of every cell's counter) and
+    only as wide as the rules need, so ages and hunger saturate once they pass
+    every age and starvation threshold.
+    """
+    HEADER = struct.Struct("<IIBB")
+
+    def __init__(self, shape, planes, age_bits, hunger_bits):
+        self.shape = shape
+        self.planes = planes  # (4 + age_bits + hunger_bits, width, words) uint64
+        self.age_bits = age_bits
+        self.hunger_bits = hunger_bits
+
+    @property
+    def types(self):
+        return self.planes[:len(PLANE_TYPES)]
+
+    @property
+    def ages(self):
+        return self.planes[len(PLANE_TYPES):len(PLANE_TYPES) + self.age_bits]
+
+    @property
+    def hunger(self):
+        return self.planes[len(PLANE_TYPES) + self.age_bits:]
+
+    @property
+    def nbytes(self):
+        return self.planes.nbytes
+
+    def snapshot(self, level=1):
+        """Serialize to compressed bytes, small enough to keep many generations in memory"""
+        width, height = self.shape
+        header = self.HEADER.pack(width, height, self.age_bits, self.hunger_bits)
+        return header + zlib.compress(self.planes.astype("<u8", copy=False).tobytes(), level)
+
+    @classmethod
+    def from_snapshot(cls, data):
+        """Restore a state saved with snapshot()"""
+        width, height, age_bits, hunger_bits = cls.HEADER.unpack_from(data)
+        words = -(-height // WORD_BITS)
+        planes = np.frombuffer(zlib.decompress(data[cls.HEADER.size:]), dtype="<u8")
+        planes = planes.astype(np.uint64).reshape(len(PLANE_TYPES) + age_bits + hunger_bits, width, words)
+        return cls((width, height), planes, age_bits, hunger_bits)
+
+
+class BitPlaneEngine(ArrayEngine):
+    """Steps the torus on packed uint64 bit-planes, 64 cells per word
+
+    Neighbour counts come from bit-parallel adders over shifted occupancy
+    planes, and the compiled RuleTable is turned into plane logic over one-hot
+    count planes and age/hunger threshold planes. step_grid() keeps a grid's
+    generation packed from step to step, step() keeps the ArrayEngine
+    interface, and pack_state()/step_state() run entirely on packed planes.
+    """
+
+    def __init__(self, config, rule_tables=None):
+        super().__init__(config, rule_tables)
+        self._shape = None
+
+        # Packed generation of the grid last stepped, current while the grid's version has not moved
+        self.state = None
+        self._grid = None
+        self._version = None
+
+    def _prepare(self, shape):
+        """Precompute the wrap and padding masks for a grid shape"""
+        if self._shape == shape:
+            return
+        self._shape = shape
+        width, height = shape
+        self._words = -(-height // WORD_BITS)
+        self._tail_bit = np.uint64((height - 1) % WORD_BITS)
+        self._valid = pack(np.ones(shape, dtype=bool))
+
+    def _north(self, plane):
+        """Shift along y so every cell sees the cell at y - 1, wrapping around the torus"""
+        out = (plane << ONE) | (np.roll(plane, 1, axis=1) >> np.uint64(WORD_BITS - 1))
+        # Cell 0 wraps to the last real cell, not to the padding at the end of the last word
+        out[:, 0] = (out[:, 0] & ~ONE) | ((plane[:, -1] >> self._tail_bit) & ONE)
+        return out
+
+    def _south(self, plane):
+        """Shift along y so every cell sees the cell at y + 1, wrapping around the torus"""
+        out = (plane >> ONE) | (np.roll(plane, -1, axis=1) << np.uint64(WORD_BITS - 1))
+        tail = ONE << self._tail_bit
+        out[:, -1] = (out[:, -1] & ~tail) | ((plane[:, 0] & ONE) << self._tail_bit)
+        return out
+
+    @staticmethod
+    def _add(a, b):
+        """Ripple-carry add two bit-sliced numbers given as plane lists, least significant first"""
+        if len(a) < len(b):
+            a, b = b, a
+        total = []
+        carry = None
+        for i, x in enumerate(a):
+            y = b[i] if i < len(b) else None
+            if y is None and carry is None:
+                total.append(x)
+                continue
+            if y is None:
+                y, carry = carry, None
+            partial = x ^ y
+            next_carry = x & y
+            if carry is not None:
+                next_carry |= partial & carry
+                partial ^= carry
+            total.append(partial)
+            carry = next_carry
+        if carry is not None:
+            total.append(carry)
+        return total
+
+    def count_plane_neighbors(self, plane):
+        """Count set neighbours of every cell as four bit-sliced planes (0-8)"""
+        north, south = self._north(plane), self._south(plane)
+        # Each column of three (y - 1, y, y + 1) as a 2-bit number; the centre column skips the cell itself
+        column = [north ^ plane ^ south, (north & plane) | (south & (north ^ plane))]
+        centre = [north ^ south, north & south]
+        west = [np.roll(bits, 1, axis=0) for bits in column]
+        east = [np.roll(bits, -1, axis=0) for bits in column]
+        return self._add(self._add(west, east), centre)
+
+    @staticmethod
+    def _one_hot(count):
+        """Split a bit-sliced count into one plane per value"""
+        planes = []
+        for value in range(9):
+            plane = None
+            for i, bit in enumerate(count):
+                term = bit if (value >> i) & 1 else ~bit
+                plane = term if plane is None else plane & term
+            planes.append(plane)
+        return planes
+
+    @staticmethod
+    def _at_least(counter, value):
+        """Plane of cells whose bit-sliced counter is >= value"""
+        if value <= 0:
+            return ~np.zeros_like(counter[0])
+        if value >= 1 << len(counter):
+            return np.zeros_like(counter[0])
+        greater = np.zeros_like(counter[0])
+        equal = ~greater
+        for i in reversed(range(len(counter))):
+            if (value >> i) & 1:
+                equal &= counter[i]
+            else:
+                greater |= equal & counter[i]
+                equal &= ~counter[i]
+        return greater | equal
+
+    @staticmethod
+    def _pairs(selected, human_counts, vampire_counts, cache):
+        """Plane of cells whose (human, vampire) neighbour counts are selected in a 9x9 table slice"""
+        result = None
+        for human_neighbors, row in enumerate(selected):
+            if not row.any():
+                continue
+            if row.all():
+                term = human_counts[human_neighbors]
+            else:
+                key = row.tobytes()
+                if key not in cache:
+                    vampires = None
+                    for vampire_neighbors in np.nonzero(row)[0]:
+                        plane = vampire_counts[vampire_neighbors]
+                        vampires = plane if vampires is None else vampires | plane
+                    cache[key] = vampires
+                term = human_counts[human_neighbors] & cache[key]
+            result = term if result is None else result | term
+        return result
+
+    def next_planes(self, types, age_buckets, starved, is_day):
+        """Compute the next human and vampire planes and the plane of vampires that fed
+
+        types holds the PLANE_TYPES occupancy planes, age_buckets one plane per
+        age bucket of the current RuleTable, starved the hunger threshold plane.
+        """
+        table = self.rule_tables.get(is_day)
+        humans, vampires = types[0], types[1]
+        empty = self._valid & ~(types[0] | types[1] | types[2] | types[3])
+        human_counts = self._one_hot(self.count_plane_neighbors(humans))
+        vampire_counts = self._one_hot(self.count_plane_neighbors(vampires))
+
+        conditions = []
+        for bucket, bucket_plane in enumerate(age_buckets):
+            conditions.append(((bucket, 0), bucket_plane & ~starved))
+            conditions.append(((bucket, 1), bucket_plane & starved))
+
+        leaving = {Cell.HUMAN: None, Cell.VAMPIRE: None}
+        arriving = {Cell.HUMAN: None, Cell.VAMPIRE: None}
+        cache = {}
+        for cell_type, type_plane in ((Cell.EMPTY, empty), (Cell.HUMAN, humans), (Cell.VAMPIRE, vampires)):
+            # Age/hunger combinations with identical outcomes share one condition plane
+            groups = {}
+            for (bucket, hungry), condition in conditions:
+                outcome = table.transitions[cell_type, :, :, bucket, hungry]
+                key = outcome.tobytes()
+                if key in groups:
+                    groups[key] = (outcome, groups[key][1] | condition)
+                else:
+                    groups[key] = (outcome, condition)
+            single = len(groups) == 1
+
+            for outcome, condition in groups.values():
+                scope = type_plane if single else type_plane & condition
+                for target in (Cell.EMPTY, Cell.HUMAN, Cell.VAMPIRE):
+                    if target == cell_type:
+                        continue
+                    pairs = self._pairs(outcome == target, human_counts, vampire_counts, cache)
+                    if pairs is None:
+                        continue
+                    moved = scope & pairs
+                    if cell_type in leaving:
+                        leaving[cell_type] = moved if leaving[cell_type] is None else leaving[cell_type] | moved
+                    if target in arriving:
+                        arriving[target] = moved if arriving[target] is None else arriving[target] | moved
+
+        next_humans = humans if leaving[Cell.HUMAN] is None else humans & ~leaving[Cell.HUMAN]
+        next_vampires = vampires if leaving[Cell.VAMPIRE] is None else vampires & ~leaving[Cell.VAMPIRE]
+        if arriving[Cell.HUMAN] is not None:
+            next_humans = next_humans | arriving[Cell.HUMAN]
+        if arriving[Cell.VAMPIRE] is not None:
+            next_vampires = next_vampires | arriving[Cell.VAMPIRE]
+        fed = vampires & ~human_counts[0]
+        return next_humans & self._valid, next_vampires & self._valid, fed
+
+    def step(self, cell_types, ages, hunger, is_day, windows=None, out=None):
+        """Compute the next generation of the grid arrays, returning new (cell_types, ages, hunger) arrays
+
+        Only rule evaluation runs on bit-planes; exact ages and hunger are kept in
+        the arrays. The whole torus is always evaluated, so windows are ignored;
+        out is as for ArrayEngine.step.
+        """
+        self._prepare(cell_types.shape)
+        height = cell_types.shape[1]
+        table = self.rule_tables.get(is_day)
+
+        types = [pack(cell_types == cell_type) for cell_type in PLANE_TYPES]
+        bucket_index = table.age_buckets[np.minimum(ages, table.age_limit)]
+        age_buckets = [pack(bucket_index == bucket) for bucket in range(table.transitions.shape[3])]
+        starved = pack(hunger >= table.hunger_threshold)
+
+        next_humans, next_vampires, fed = self.next_planes(types, age_buckets, starved, is_day)
+
+        next_types = np.where((cell_types == Cell.HUMAN) | (cell_types == Cell.VAMPIRE), Cell.EMPTY, cell_types)
+        next_types[unpack(next_humans, height)] = Cell.HUMAN
+        next_types[unpack(next_vampires, height)] = Cell.VAMPIRE
+        fed_hunger = np.where(unpack(fed, height), 0, hunger)
+        return self.apply(cell_types, ages, fed_hunger, next_types.astype(cell_types.dtype, copy=False), out)
+
+    def step_grid(self, grid, is_day):
+        """Advance a grid one generation on a packed state kept between steps
+
+        The grid arrays are only unpacked when they are next read, and the state
+        is packed from them again once the grid was edited (its version moved).
+        """
+        if grid is not self._grid or grid.version != self._version:
+            self.state = self.pack_state(grid.cell_types, grid.ages, grid.hunger, exact=True)
+            self._grid = grid
+        self.state = state = self.step_state(self.state, is_day)
+        grid.defer(lambda: self.unpack_state(state, out=(grid.cell_types, grid.ages, grid.hunger)))
+        self._version = grid.version
+
+    def _counter_limits(self):
+        """Largest age and hunger values any threshold of either ruleset distinguishes"""
+        tables = [self.rule_tables.get(is_day) for is_day in (True, False)]
+        age_limit = max(table.age_limit for table in tables)
+        hunger_limit = max(max(int(np.ceil(table.hunger_threshold)), 0) for table in tables)
+        return age_limit, hunger_limit
+
+    def _counter_bits(self):
+        """Counter widths that keep every age and starvation threshold of both rulesets exact"""
+        age_limit, hunger_limit = self._counter_limits()
+        return age_limit.bit_length(), max(hunger_limit.bit_length(), 1)
+
+    def pack_state(self, cell_types, ages, hunger, exact=False):
+        """Pack grid arrays into a BitPlaneState, saturating ages and hunger at the counter widths
+
+        exact keeps counters as wide as the arrays' dtypes, so they unpack unchanged.
+        """
+        self._prepare(cell_types.shape)
+        if exact:
+            age_bits, hunger_bits = ages.dtype.itemsize * 8, hunger.dtype.itemsize * 8
+        else:
+            age_bits, hunger_bits = self._counter_bits()
+        ages = np.minimum(ages, (1 << age_bits) - 1)
+        hunger = np.minimum(hunger, (1 << hunger_bits) - 1)
+
+        planes = [pack(cell_types == cell_type) for cell_type in PLANE_TYPES]
+        planes += [pack((ages >> bit) & 1 == 1) for bit in range(age_bits)]
+        planes += [pack((hunger >> bit) & 1 == 1) for bit in range(hunger_bits)]
+        return BitPlaneState(cell_types.shape, np.stack(planes), age_bits, hunger_bits)
+
+    def unpack_state(self, state, out=None):
+        """Unpack a BitPlaneState into (cell_types, ages, hunger) arrays; ages and hunger stay saturated
+
+        out optionally gives three arrays to unpack into instead.
+        """
+        height = state.shape[1]
+        if out is None:
+            out = (np.empty(state.shape, dtype=np.uint8),
+                   np.empty(state.shape, dtype=np.uint16),
+                   np.empty(state.shape, dtype=np.uint16))
+        cell_types, ages, hunger = out
+        cell_types.fill(Cell.EMPTY)
+        for cell_type, plane in zip(PLANE_TYPES, state.types):
+            # Types never overlap, so adding them sets each cell once
+            cell_types += unpack(plane, height) * cell_types.dtype.type(cell_type)
+        for counter, planes in ((ages, state.ages), (hunger, state.hunger)):
+            counter.fill(0)
+            for bit, plane in enumerate(planes):
+                if plane.any():  # The high bits of exact counters are almost always clear
+                    counter |= unpack(plane, height).astype(counter.dtype) << bit
+        return out
+
+    def _capped(self, counter, cap):
+        """Bit-sliced min(counter, cap), only as wide as cap"""
+        saturated = self._at_least(counter, cap)
+        return [counter[i] | saturated if (cap >> i) & 1 else counter[i] & ~saturated
+                for i in range(min(len(counter), cap.bit_length()))]
+
+    def state_hash(self, state=None):
+        """Hash of a packed state (by default the one step_grid keeps) for cycle detection
+
+        As with StateHasher, ages and hunger count only up to the values the
+        rules tell apart, so equal hashes mean the states evolve the same way;
+        the hash values themselves differ from StateHasher's.
+        """
+        state = self.state if state is None else state
+        age_limit, hunger_limit = self._counter_limits()
+        planes = list(state.types) + self._capped(list(state.ages), age_limit)
+        planes += self._capped(list(state.hunger), hunger_limit)
+        digest = hashlib.blake2b(digest_size=8)
+        for plane in planes:
+            digest.update(np.ascontiguousarray(plane))
+        return int.from_bytes(digest.digest(), "little")
+
+    @staticmethod
+    def _increment(counter, mask):
+        """Saturating bit-sliced increment of the cells in mask"""
+        saturated = mask
+        for bit in counter:
+            saturated = saturated & bit
+        carry = mask & ~saturated
+        result = []
+        for bit in counter:
+            result.append(bit ^ carry)
+            carry = bit & carry
+        return result
+
+    def step_state(self, state, is_day):
+        """Advance a BitPlaneState one generation without leaving the packed representation"""
+        self._prepare(state.shape)
+        table = self.rule_tables.get(is_day)
+        types = list(state.types)
+        ages = list(state.ages)
+        hunger = list(state.hunger)
+
+        # Threshold planes from the bit-sliced counters
+        boundaries = [int(np.argmax(table.age_buckets == bucket)) for bucket in range(table.transitions.shape[3])]
+        at_least = [self._at_least(ages, boundary) for boundary in boundaries] + [np.zeros_like(types[0])]
+        age_buckets = [at_least[bucket] & ~at_least[bucket + 1] for bucket in range(len(boundaries))]
+        starved = self._at_least(hunger, int(np.ceil(table.hunger_threshold)))
+
+        next_humans, next_vampires, fed = self.next_planes(types, age_buckets, starved, is_day)
+
+        # Ages restart on type change, grow while unchanged, and are zero for empty cells
+        unchanged = (types[0] & next_humans) | (types[1] & next_vampires) | types[2] | types[3]
+        next_ages = [bit & unchanged for bit in self._increment(ages, unchanged)]
+
+        # Surviving vampires get hungrier, starting from zero if they fed
+        survivors = types[1] & next_vampires
+        next_hunger = [bit & survivors for bit in self._increment([bit & ~fed for bit in hunger], survivors)]
+
+        planes = np.stack([next_humans, next_vampires, types[2], types[3]] + next_ages + next_hunger)
+        return BitPlaneState(state.shape, planes, state.age_bits, state.hunger_bits)
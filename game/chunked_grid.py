@@ -0,0 +1,303 @@
+import random
+import numpy as np
+from game.entities import Cell
+from game.grid import Grid
+from game.population import PopulationCounter
+
+
+# Offsets of the eight chunks surrounding a chunk
+NEIGHBOR_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+
+
+class Chunk:
+    """Fixed-size square block of an unbounded world, stored like Grid's [x][y] arrays"""
+    __slots__ = ("cell_types", "ages", "hunger", "active", "changed")
+
+    def __init__(self, size):
+        self.cell_types = np.zeros((size, size), dtype=Grid.TYPE_DTYPE)
+        self.ages = np.zeros((size, size), dtype=Grid.AGE_DTYPE)
+        self.hunger = np.zeros((size, size), dtype=Grid.HUNGER_DTYPE)
+        self.active = True  # Needs rule evaluation on the next step
+        self.changed = True  # Some cell changed type in the last step or edit
+
+    def is_empty(self):
+        return not self.cell_types.any()
+
+
+class ChunkedGrid:
+    """Unbounded world without wrap-around, made of lazily allocated chunks.
+
+    Chunks are allocated when living cells reach the border facing them and
+    freed once they are empty and static, so memory follows the occupied area
+    rather than its bounding box. Coordinates may be any integers.
+    """
+    UNBOUNDED = True
+
+    def __init__(self, config):
+        self.config = config
+        self.chunk_size = config.CHUNK_SIZE
+        self.chunks = {}
+
+        # Population counts and age statistics over the allocated cells
+        self.population = PopulationCounter(self._tally_all, Grid.AGE_MAX)
+        self.population.clear(0)
+
+    def _locate(self, x, y):
+        """Split world coordinates into a chunk key and local coordinates"""
+        size = self.chunk_size
+        return (x // size, y // size), (x % size, y % size)
+
+    def _get_chunk(self, key, create=False):
+        chunk = self.chunks.get(key)
+        if chunk is None and create:
+            chunk = self.chunks[key] = Chunk(self.chunk_size)
+            self.population.resize(self.chunk_size ** 2)
+        return chunk
+
+    def _tally_all(self, exact=True):
+        return PopulationCounter.combine(PopulationCounter.tally(chunk.cell_types, chunk.ages, exact)
+                                         for chunk in self.chunks.values())
+
+    def reset(self):
+        """Remove every chunk, leaving an empty world"""
+        self.chunks.clear()
+        self.population.clear(0)
+
+    def mark_all_dirty(self):
+        """Flag every chunk for re-evaluation on the next step"""
+        for chunk in self.chunks.values():
+            chunk.active = True
+
+    def random_populate(self, human_ratio=0.1, vampire_ratio=0.05, forest_ratio=0.05, bunker_ratio=0.03,
+                        width=None, height=None, seed=None):
+        """Randomly populate a width x height area at the origin (GRID_WIDTH x GRID_HEIGHT by default)"""
+        self.reset()
+        width = width or self.config.GRID_WIDTH
+        height = height or self.config.GRID_HEIGHT
+
+        # Same draw order, thresholds and seeding as Grid.random_populate
+        rng = random if seed is None else random.Random(seed)
+        rolls = np.array([rng.random() for _ in range(width * height)]).reshape(width, height)
+        cell_types = np.zeros(rolls.shape, dtype=Grid.TYPE_DTYPE)
+        unassigned = np.ones(rolls.shape, dtype=bool)
+        thresholds = [
+            (human_ratio, Cell.HUMAN),
+            (human_ratio + vampire_ratio, Cell.VAMPIRE),
+            (human_ratio + vampire_ratio + forest_ratio, Cell.FOREST),
+            (human_ratio + vampire_ratio + forest_ratio + bunker_ratio, Cell.BUNKER)
+        ]
+        for threshold, cell_type in thresholds:
+            selected = unassigned & (rolls < threshold)
+            cell_types[selected] = cell_type
+            unassigned &= ~selected
+
+        size = self.chunk_size
+        for x0 in range(0, width, size):
+            for y0 in range(0, height, size):
+                block = cell_types[x0:x0 + size, y0:y0 + size]
+                if block.any():
+                    chunk = self._get_chunk((x0 // size, y0 // size), create=True)
+                    chunk.cell_types[:block.shape[0], :block.shape[1]] = block
+        self.population.invalidate()
+
+    def get_cell(self, x, y):
+        """Get a read-only copy of the cell at (x, y); use set_cell to change it"""
+        key, (local_x, local_y) = self._locate(x, y)
+        cell = Cell(x, y)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            cell.cell_type = int(chunk.cell_types[local_x, local_y])
+            cell.age = int(chunk.ages[local_x, local_y])
+        return cell
+
+    def set_cell(self, x, y, cell_type):
+        """Set the cell type at the specified position"""
+        key, (local_x, local_y) = self._locate(x, y)
+        chunk = self._get_chunk(key, create=cell_type != Cell.EMPTY)
+        if chunk is None:
+            return  # Erasing inside an unallocated chunk changes nothing
+        self.population.edit(int(chunk.cell_types[local_x, local_y]), int(chunk.ages[local_x, local_y]),
+                             cell_type, int(chunk.ages[local_x, local_y]))
+        chunk.cell_types[local_x, local_y] = cell_type
+        chunk.active = chunk.changed = True
+
+    def add_pattern(self, pattern, x_offset, y_offset):
+        """Add a predefined pattern to the world"""
+        for y, row in enumerate(pattern):
+            for x, cell_value in enumerate(row):
+                self.set_cell(x + x_offset, y + y_offset, cell_value)
+
+    def count_neighbors(self, x, y, cell_type):
+        """Count neighbors of specified type around the cell at (x, y)"""
+        count = 0
+        for dx in [-1, 0, 1]:
+            for dy in [-1, 0, 1]:
+                if (dx or dy) and self.get_cell(x + dx, y + dy).cell_type == cell_type:
+                    count += 1
+        return count
+
+    def count_types(self):
+        """Count allocated cells of each type, indexed by cell type"""
+        return self.population.counts
+
+    def bounds(self):
+        """Get the (min_x, min_y, max_x, max_y) box of occupied cells, or None for an empty world"""
+        xs, ys = [], []
+        size = self.chunk_size
+        for (chunk_x, chunk_y), chunk in self.chunks.items():
+            occupied_x, occupied_y = np.nonzero(chunk.cell_types)
+            if occupied_x.size:
+                xs += [chunk_x * size + occupied_x.min(), chunk_x * size + occupied_x.max()]
+                ys += [chunk_y * size + occupied_y.min(), chunk_y * size + occupied_y.max()]
+        if not xs:
+            return None
+        return int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys))
+
+    @property
+    def memory_bytes(self):
+        """Bytes held by allocated chunk arrays"""
+        return sum(chunk.cell_types.nbytes + chunk.ages.nbytes + chunk.hunger.nbytes
+                   for chunk in self.chunks.values())
+
+    def get_ages(self, cell_type):
+        """List the ages of every cell of the given type"""
+        ages = []
+        for chunk in self.chunks.values():
+            ages += chunk.ages[chunk.cell_types == cell_type].tolist()
+        return ages
+
+    def get_population_stats(self):
+        """Get statistics about the world population, in the same format as Grid"""
+        return self.population.get_stats()
+
+    def get_serialized_state(self):
+        """Convert the allocated chunks to a serializable format"""
+        return {
+            "chunk_size": self.chunk_size,
+            "chunks": [
+                {
+                    "x": key[0],
+                    "y": key[1],
+                    "cell_types": chunk.cell_types.tolist(),
+                    "ages": chunk.ages.tolist(),
+                    "hunger": chunk.hunger.tolist()
+                }
+                for key, chunk in self.chunks.items() if not chunk.is_empty()
+            ]
+        }
+
+    def load_from_serialized(self, state):
+        """Load chunks from a serialized state produced with the same chunk size"""
+        if state["chunk_size"] != self.chunk_size:
+            raise ValueError(f"Saved chunk size {state['chunk_size']} does not match {self.chunk_size}")
+        self.reset()
+        for saved in state["chunks"]:
+            chunk = self._get_chunk((saved["x"], saved["y"]), create=True)
+            chunk.cell_types[:] = saved["cell_types"]
+            chunk.ages[:] = saved["ages"]
+            chunk.hunger[:] = saved["hunger"]
+        self.population.invalidate()
+
+    def _border_neighbors(self, chunk):
+        """Offsets of the neighbouring chunks touched by living cells on this chunk's border"""
+        alive = (chunk.cell_types == Cell.HUMAN) | (chunk.cell_types == Cell.VAMPIRE)
+        offsets = []
+        for dx, dy in NEIGHBOR_OFFSETS:
+            # Edge neighbours see a whole border line, diagonal neighbours a single corner cell
+            edge_x = 0 if dx < 0 else -1 if dx > 0 else slice(None)
+            edge_y = 0 if dy < 0 else -1 if dy > 0 else slice(None)
+            if alive[edge_x, edge_y].any():
+                offsets.append((dx, dy))
+        return offsets
+
+    def _grow(self):
+        """Allocate empty chunks wherever living cells could spread into them"""
+        needed = set()
+        for (chunk_x, chunk_y), chunk in list(self.chunks.items()):
+            for dx, dy in self._border_neighbors(chunk):
+                key = (chunk_x + dx, chunk_y + dy)
+                needed.add(key)
+                self._get_chunk(key, create=True)
+        return needed
+
+    def _build_windows(self, keys):
+        """Gather each chunk's cell types with a one-cell border from its neighbours"""
+        size = self.chunk_size
+        windows = np.zeros((len(keys), size + 2, size + 2), dtype=Grid.TYPE_DTYPE)
+        inner = slice(1, size + 1)
+        for index, (chunk_x, chunk_y) in enumerate(keys):
+            window = windows[index]
+            window[inner, inner] = self.chunks[(chunk_x, chunk_y)].cell_types
+            for dx, dy in NEIGHBOR_OFFSETS:
+                neighbor = self.chunks.get((chunk_x + dx, chunk_y + dy))
+                if neighbor is None:
+                    continue  # Unallocated space is empty
+                source_x = -1 if dx < 0 else 0 if dx > 0 else slice(None)
+                source_y = -1 if dy < 0 else 0 if dy > 0 else slice(None)
+                target_x = 0 if dx < 0 else size + 1 if dx > 0 else inner
+                target_y = 0 if dy < 0 else size + 1 if dy > 0 else inner
+                window[target_x, target_y] = neighbor.cell_types[source_x, source_y]
+        return windows
+
+    def step(self, engine, is_day):
+        """Advance every chunk one generation with an ArrayEngine, returning the evaluated fraction"""
+        needed = self._grow()
+
+        # Only chunks that are active, or border an active chunk, can change
+        evaluate = set()
+        for (chunk_x, chunk_y), chunk in self.chunks.items():
+            if chunk.active:
+                evaluate.add((chunk_x, chunk_y))
+                for dx, dy in NEIGHBOR_OFFSETS:
+                    if (chunk_x + dx, chunk_y + dy) in self.chunks:
+                        evaluate.add((chunk_x + dx, chunk_y + dy))
+        keys = sorted(evaluate)
+
+        ruleset = self.config.rules["day"] if is_day else self.config.rules["night"]
+        wisdom_age = ruleset["human"]["wisdom_age"]
+
+        before = after = PopulationCounter.combine([])
+        if keys:
+            windows = self._build_windows(keys)
+            cell_types = windows[:, 1:-1, 1:-1]
+            ages = np.stack([self.chunks[key].ages for key in keys])
+            hunger = np.stack([self.chunks[key].hunger for key in keys])
+            human_neighbors = engine.count_window_neighbors(windows, Cell.HUMAN)
+            vampire_neighbors = engine.count_window_neighbors(windows, Cell.VAMPIRE)
+            next_types, fed_hunger = engine.next_states(
+                cell_types, ages, hunger, human_neighbors, vampire_neighbors, is_day)
+            next_types, next_ages, next_hunger = engine.apply(cell_types, ages, fed_hunger, next_types)
+            before = PopulationCounter.tally(cell_types, ages)
+            after = PopulationCounter.tally(next_types, next_ages)
+
+            for index, key in enumerate(keys):
+                chunk = self.chunks[key]
+                chunk.changed = bool((next_types[index] != chunk.cell_types).any())
+                chunk.cell_types[:] = next_types[index]
+                chunk.ages[:] = next_ages[index]
+                chunk.hunger[:] = next_hunger[index]
+
+        # Quiet chunks only age, so only the evaluated chunks need recounting
+        self.population.advance(before, after)
+
+        # Quiet chunks keep their cells and just age
+        for key, chunk in self.chunks.items():
+            if key not in evaluate:
+                _, chunk.ages[:], chunk.hunger[:] = engine.apply(
+                    chunk.cell_types, chunk.ages, chunk.hunger, chunk.cell_types)
+                chunk.changed = False
+
+            # Same pending-state rule as the dirty tiles of Simulation
+            cell_types = chunk.cell_types
+            chunk.active = chunk.changed or bool(
+                (cell_types == Cell.VAMPIRE).any() or
+                ((cell_types == Cell.HUMAN) & (chunk.ages <= wisdom_age + 1)).any())
+
+        active_fraction = len(keys) / len(self.chunks) if self.chunks else 0.0
+
+        # Free chunks that are empty, did not change and are not about to receive life
+        for key in [key for key, chunk in self.chunks.items()
+                    if not chunk.changed and key not in needed and chunk.is_empty()]:
+            del self.chunks[key]
+            self.population.resize(-self.chunk_size ** 2)
+        return active_fraction
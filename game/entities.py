@@ -9,26 +9,54 @@ class Cell:
         self.x = x
         self.y = y
         self.cell_type = cell_type
-        self.next_state = cell_type
         self.age = 0
         self.last_fed = 0  # Tracks when vampire last fed
 
-    def update(self):
-        """Update cell state"""
-        old_type = self.cell_type
-        self.cell_type = self.next_state
+    def is_human(self):
+        return self.cell_type == Cell.HUMAN
+
+    def is_vampire(self):
+        return self.cell_type == Cell.VAMPIRE
+
+    def is_empty(self):
+        return self.cell_type == Cell.EMPTY
+
+    def is_forest(self):
+        return self.cell_type == Cell.FOREST
+
+    def is_bunker(self):
+        return self.cell_type == Cell.BUNKER
 
-        # Reset age when type changes
-        if old_type != self.cell_type and self.cell_type != Cell.EMPTY:
-            self.age = 0
-        # Increment age for non-empty cells
-        elif self.cell_type != Cell.EMPTY:
-            self.age += 1
-        else:
-            self.age = 0
 
-    def set_next_state(self, state):
-        self.next_state = state
+class CellView:
+    """Lightweight proxy exposing one cell of an array-backed Grid through the Cell interface"""
+    __slots__ = ("grid", "x", "y")
+
+    def __init__(self, grid, x, y):
+        self.grid = grid
+        self.x = x
+        self.y = y
+
+    @property
+    def cell_type(self):
+        return int(self.grid.cell_types[self.x, self.y])
+
+    @cell_type.setter
+    def cell_type(self, value):
+        self.grid.record_edit(self.x, self.y, cell_type=value)
+        self.grid.cell_types[self.x, self.y] = value
+        self.grid.mark_dirty(self.x, self.y)
+
+    @property
+    def age(self):
+        return int(self.grid.ages[self.x, self.y])
+
+    @age.setter
+    def age(self, value):
+        value = min(max(value, 0), self.grid.AGE_MAX)
+        self.grid.record_edit(self.x, self.y, age=value)
+        self.grid.ages[self.x, self.y] = value
+        self.grid.mark_dirty(self.x, self.y)
 
     def is_human(self):
         return self.cell_type == Cell.HUMAN
@@ -46,11 +74,69 @@ class Cell:
         return self.cell_type == Cell.BUNKER
 
 
+class CellColumnView:
+    """Column of CellView proxies so that grid.cells[x][y] keeps working"""
+    __slots__ = ("grid", "x")
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.x = x
+
+    def __len__(self):
+        return self.grid.height
+
+    def __getitem__(self, y):
+        if not -self.grid.height <= y < self.grid.height:
+            raise IndexError("cell index out of range")
+        return CellView(self.grid, self.x, y % self.grid.height)
+
+    def __iter__(self):
+        for y in range(self.grid.height):
+            yield CellView(self.grid, self.x, y)
+
+
+class CellGridView:
+    """Read/write view over an array-backed Grid indexed as cells[x][y]"""
+    __slots__ = ("grid",)
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, x):
+        if not -self.grid.width <= x < self.grid.width:
+            raise IndexError("cell index out of range")
+        return CellColumnView(self.grid, x % self.grid.width)
+
+    def __iter__(self):
+        for x in range(self.grid.width):
+            yield CellColumnView(self.grid, x)
+
+
 class Human:
+    MAX_COLOR_AGE = 23  # get_color stops changing with age from here on
+    _palette = None  # (HUMAN_COLOR it was built from, colors indexed by [is_day][age])
+
+    @staticmethod
+    def palette(config):
+        """get_color for every (is_day, age) up to MAX_COLOR_AGE, rebuilt whenever HUMAN_COLOR changes"""
+        base_color = tuple(config.HUMAN_COLOR)
+        if Human._palette is None or Human._palette[0] != base_color:
+            colors = [[Human._color(base_color, is_day, age) for age in range(Human.MAX_COLOR_AGE + 1)]
+                      for is_day in (False, True)]
+            Human._palette = (base_color, colors)
+        return Human._palette[1]
+
     @staticmethod
     def get_color(config, is_day, age=0):
         """Get human cell color based on time and age"""
-        base_color = list(config.HUMAN_COLOR)
+        return Human.palette(config)[bool(is_day)][min(max(age, 0), Human.MAX_COLOR_AGE)]
+
+    @staticmethod
+    def _color(base_color, is_day, age):
+        base_color = list(base_color)
 
         # Older humans are slightly lighter (wiser)
         age_factor = min(age / 20, 1)
@@ -88,10 +174,32 @@ class Human:
 
 
 class Vampire:
+    MAX_COLOR_AGE = 26  # get_color stops changing with age from here on
+    MAX_COLOR_HUNGER = 5  # ...and with hunger from here on
+    _palette = None  # (VAMPIRE_COLOR it was built from, colors indexed by [is_day][age][hunger])
+
+    @staticmethod
+    def palette(config):
+        """get_color for every (is_day, age, hunger) up to the caps, rebuilt whenever VAMPIRE_COLOR changes"""
+        base_color = tuple(config.VAMPIRE_COLOR)
+        if Vampire._palette is None or Vampire._palette[0] != base_color:
+            hungers = range(Vampire.MAX_COLOR_HUNGER + 1)
+            colors = [[[Vampire._color(base_color, is_day, age, hunger) for hunger in hungers]
+                       for age in range(Vampire.MAX_COLOR_AGE + 1)]
+                      for is_day in (False, True)]
+            Vampire._palette = (base_color, colors)
+        return Vampire._palette[1]
+
     @staticmethod
     def get_color(config, is_day, age=0, hunger=0):
         """Get vampire cell color based on time, age and hunger"""
-        base_color = list(config.VAMPIRE_COLOR)
+        age = min(max(age, 0), Vampire.MAX_COLOR_AGE)
+        hunger = min(max(hunger, 0), Vampire.MAX_COLOR_HUNGER)
+        return Vampire.palette(config)[bool(is_day)][age][hunger]
+
+    @staticmethod
+    def _color(base_color, is_day, age, hunger):
+        base_color = list(base_color)
 
         # Older vampires are slightly darker and more red
         age_factor = min(age / 20, 1)
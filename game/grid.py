@@ -1,39 +1,195 @@
 import random
-from game.entities import Cell
+import numpy as np
+from game.entities import Cell, CellGridView
+from game.population import PopulationCounter
 
 
 class Grid:
+    # Narrow dtypes for the struct-of-arrays backend; ages and hunger saturate at their maximum
+    TYPE_DTYPE = np.uint8
+    AGE_DTYPE = np.uint16
+    HUNGER_DTYPE = np.uint16
+    AGE_MAX = int(np.iinfo(AGE_DTYPE).max)
+    HUNGER_MAX = int(np.iinfo(HUNGER_DTYPE).max)
+    UNBOUNDED = False  # Fixed-size torus; see ChunkedGrid for the unbounded world
+
     def __init__(self, config):
         self.config = config
         self.width = config.GRID_WIDTH
         self.height = config.GRID_HEIGHT
-        self.cells = [[Cell(x, y) for y in range(self.height)] for x in range(self.width)]
+
+        # Cell state is stored as contiguous [x][y] arrays rather than one object per cell. There are
+        # two sets: the front one holds the current generation while a step writes the back one
+        shape = (self.width, self.height)
+        self._buffers = [
+            (np.zeros(shape, dtype=self.TYPE_DTYPE),
+             np.zeros(shape, dtype=self.AGE_DTYPE),
+             np.zeros(shape, dtype=self.HUNGER_DTYPE))
+            for _ in range(2)
+        ]
+        self._front = 0
+        # Set while an engine holds a newer generation than the arrays (see defer)
+        self._sync = None
+
+        # Compatibility view so callers can keep using grid.cells[x][y]
+        self.cells = CellGridView(self)
+
+        # Tiles that were edited or changed since the last step and must be re-evaluated
+        self.tile_size = config.TILE_SIZE
+        self.tiles_x = -(-self.width // self.tile_size)
+        self.tiles_y = -(-self.height // self.tile_size)
+        self.dirty_tiles = np.ones((self.tiles_x, self.tiles_y), dtype=bool)
+
+        # Bumped whenever the cell arrays may have changed, so renderers can skip unchanged frames
+        self.version = 0
+
+        # Population counts and age statistics, maintained as cells change
+        self.population = PopulationCounter(self._tally_all, self.AGE_MAX)
+        self.population.clear(self.width * self.height)
+
+        # Session recorder told about populations and edits (see game.replay), if any
+        self.recorder = None
+
+    @property
+    def cell_types(self):
+        if self._sync is not None:
+            self._flush()
+        return self._buffers[self._front][0]
+
+    @property
+    def ages(self):
+        if self._sync is not None:
+            self._flush()
+        return self._buffers[self._front][1]
+
+    @property
+    def hunger(self):
+        if self._sync is not None:
+            self._flush()
+        return self._buffers[self._front][2]
+
+    @property
+    def back_buffers(self):
+        """(cell_types, ages, hunger) arrays for the next generation; only valid once a step filled them"""
+        return self._buffers[1 - self._front]
+
+    def swap_buffers(self):
+        """Make the back buffers, just written by a step, the current generation"""
+        self._front = 1 - self._front
+        self.version += 1
+
+    def defer(self, sync):
+        """Record a step an engine made in its own representation; sync() writes it into the arrays when they are next read"""
+        self._sync = sync
+        self.version += 1
+
+    def _flush(self):
+        sync, self._sync = self._sync, None
+        sync()
+
+    def use_buffers(self, buffers=None):
+        """Move the cell state into two given (cell_types, ages, hunger) sets, such as shared memory
+
+        Without buffers the state moves back into arrays owned by the grid.
+        """
+        if self._sync is not None:
+            self._flush()
+        if buffers is None:
+            buffers = [tuple(np.empty_like(array) for array in arrays) for arrays in self._buffers]
+        for new, old in zip(buffers, self._buffers):
+            for new_array, old_array in zip(new, old):
+                np.copyto(new_array, old_array)
+        self._buffers = [tuple(arrays) for arrays in buffers]
 
     def reset(self):
         """Reset the grid to all empty cells"""
-        for x in range(self.width):
-            for y in range(self.height):
-                self.cells[x][y] = Cell(x, y)
+        self.cell_types.fill(Cell.EMPTY)
+        self.ages.fill(0)
+        self.hunger.fill(0)
+        self.population.clear(self.width * self.height)
+        self.mark_all_dirty()
+
+    def mark_dirty(self, x, y):
+        """Flag the tile containing (x, y) for re-evaluation on the next step"""
+        self.dirty_tiles[(x % self.width) // self.tile_size, (y % self.height) // self.tile_size] = True
+        self.version += 1
+
+    def mark_all_dirty(self):
+        """Flag every tile for re-evaluation on the next step"""
+        self.dirty_tiles.fill(True)
+        self.version += 1
+
+    def tiles_containing(self, mask):
+        """Reduce a per-cell boolean mask to a per-tile mask"""
+        size = self.tile_size
+        padded = np.zeros((self.tiles_x * size, self.tiles_y * size), dtype=bool)
+        padded[:self.width, :self.height] = mask
+        return padded.reshape(self.tiles_x, size, self.tiles_y, size).any(axis=(1, 3))
+
+    def cells_near(self, tiles):
+        """Flat indices, in order, of the cells in the flagged tiles and the tiles around them
+
+        A step that only re-evaluated the flagged tiles, window margins included,
+        cannot have changed the type of any other cell.
+        """
+        near = tiles.copy()
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                near |= np.roll(tiles, (dx, dy), axis=(0, 1))
+        size = self.tile_size
+        cells = np.repeat(np.repeat(near, size, axis=0), size, axis=1)[:self.width, :self.height]
+        return np.flatnonzero(cells)
+
+    def tile_windows(self, tiles, margin):
+        """Get wrapped (xs, ys) index arrays covering each flagged tile plus a margin of cells"""
+        tile_x, tile_y = np.nonzero(tiles)
+        offsets = np.arange(-margin, self.tile_size + margin)
+        xs = (tile_x[:, None] * self.tile_size + offsets) % self.width
+        ys = (tile_y[:, None] * self.tile_size + offsets) % self.height
+        return xs, ys
 
-    def random_populate(self, human_ratio=0.1, vampire_ratio=0.05, forest_ratio=0.05, bunker_ratio=0.03):
-        """Randomly populate the grid with humans, vampires, forests and bunkers"""
+    def random_populate(self, human_ratio=0.1, vampire_ratio=0.05, forest_ratio=0.05, bunker_ratio=0.03,
+                        seed=None):
+        """Randomly populate the grid with humans, vampires, forests and bunkers
+
+        With a seed the draws come from a private random.Random(seed); otherwise
+        from the global random module, unless a recorder needs a seed to log.
+        """
         self.reset()
+        if self.recorder is not None:
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            self.recorder.random_populate(seed, (human_ratio, vampire_ratio, forest_ratio, bunker_ratio))
+        rng = random if seed is None else random.Random(seed)
+
+        # Draw one number per cell in the same x-major order as the per-cell loop did
+        rolls = np.array([rng.random() for _ in range(self.width * self.height)])
+        rolls = rolls.reshape(self.width, self.height)
+
+        thresholds = [
+            (human_ratio, Cell.HUMAN),
+            (human_ratio + vampire_ratio, Cell.VAMPIRE),
+            (human_ratio + vampire_ratio + forest_ratio, Cell.FOREST),
+            (human_ratio + vampire_ratio + forest_ratio + bunker_ratio, Cell.BUNKER)
+        ]
+        unassigned = np.ones(rolls.shape, dtype=bool)
+        for threshold, cell_type in thresholds:
+            selected = unassigned & (rolls < threshold)
+            self.cell_types[selected] = cell_type
+            unassigned &= ~selected
+        self.population.invalidate()
+        self.mark_all_dirty()
+
+    def _tally_all(self, exact=True):
+        return PopulationCounter.tally(self.cell_types, self.ages, exact)
 
-        for x in range(self.width):
-            for y in range(self.height):
-                r = random.random()
-                if r < human_ratio:
-                    self.cells[x][y].cell_type = Cell.HUMAN
-                    self.cells[x][y].next_state = Cell.HUMAN
-                elif r < human_ratio + vampire_ratio:
-                    self.cells[x][y].cell_type = Cell.VAMPIRE
-                    self.cells[x][y].next_state = Cell.VAMPIRE
-                elif r < human_ratio + vampire_ratio + forest_ratio:
-                    self.cells[x][y].cell_type = Cell.FOREST
-                    self.cells[x][y].next_state = Cell.FOREST
-                elif r < human_ratio + vampire_ratio + forest_ratio + bunker_ratio:
-                    self.cells[x][y].cell_type = Cell.BUNKER
-                    self.cells[x][y].next_state = Cell.BUNKER
+    def record_edit(self, x, y, cell_type=None, age=None):
+        """Update the population counters for a cell about to get a new type and/or age"""
+        old_type = int(self.cell_types[x, y])
+        old_age = int(self.ages[x, y])
+        self.population.edit(old_type, old_age,
+                             old_type if cell_type is None else cell_type,
+                             old_age if age is None else age)
 
     def get_cell(self, x, y):
         """Get the cell at the specified position, handling wrap-around"""
@@ -45,8 +201,11 @@ class Grid:
         """Set the cell type at the specified position"""
         x = x % self.width
         y = y % self.height
-        self.cells[x][y].cell_type = cell_type
-        self.cells[x][y].next_state = cell_type
+        if self.recorder is not None:
+            self.recorder.set_cell(x, y, cell_type)
+        self.record_edit(x, y, cell_type=cell_type)
+        self.cell_types[x, y] = cell_type
+        self.mark_dirty(x, y)
 
     def count_neighbors(self, x, y, cell_type):
         """Count neighbors of specified type around the cell at (x, y)"""
@@ -58,7 +217,7 @@ class Grid:
                     continue
 
                 nx, ny = (x + dx) % self.width, (y + dy) % self.height
-                if self.cells[nx][ny].cell_type == cell_type:
+                if self.cell_types[nx, ny] == cell_type:
                     count += 1
 
         return count
@@ -73,76 +232,45 @@ class Grid:
                     continue
 
                 nx, ny = (x + dx) % self.width, (y + dy) % self.height
-                cell = self.cells[nx][ny]
-
-                if cell_type is None or cell.cell_type == cell_type:
-                    neighbors.append(cell)
+                if cell_type is None or self.cell_types[nx, ny] == cell_type:
+                    neighbors.append(self.cells[nx][ny])
 
         return neighbors
 
     def get_serialized_state(self):
         """Convert grid to a serializable format for saving"""
-        return [[cell.cell_type for cell in row] for row in self.cells]
+        return self.cell_types.tolist()
 
     def load_from_serialized(self, state):
         """Load grid from a serialized state"""
-        for x in range(min(len(state), self.width)):
-            for y in range(min(len(state[0]), self.height)):
-                self.cells[x][y].cell_type = state[x][y]
-                self.cells[x][y].next_state = state[x][y]
-                self.cells[x][y].age = 0  # Reset age when loading
+        state = np.asarray(state, dtype=self.TYPE_DTYPE)
+        width = min(state.shape[0], self.width)
+        height = min(state.shape[1], self.height)
+        self.cell_types[:width, :height] = state[:width, :height]
+        self.ages[:width, :height] = 0  # Reset age when loading
+        self.population.invalidate()
+        self.mark_all_dirty()
+
+    def count_types(self):
+        """Count cells of each type, indexed by cell type"""
+        return self.population.counts
+
+    def get_ages(self, cell_type):
+        """List the ages of every cell of the given type"""
+        return self.ages[self.cell_types == cell_type].tolist()
 
     def get_population_stats(self):
         """Get statistics about the grid population"""
-        stats = {
-            "human_count": 0,
-            "vampire_count": 0,
-            "empty_count": 0,
-            "forest_count": 0,
-            "bunker_count": 0,
-            "human_ages": [],
-            "vampire_ages": []
-        }
-
-        for x in range(self.width):
-            for y in range(self.height):
-                cell = self.cells[x][y]
-
-                if cell.is_human():
-                    stats["human_count"] += 1
-                    stats["human_ages"].append(cell.age)
-                elif cell.is_vampire():
-                    stats["vampire_count"] += 1
-                    stats["vampire_ages"].append(cell.age)
-                elif cell.is_forest():
-                    stats["forest_count"] += 1
-                elif cell.is_bunker():
-                    stats["bunker_count"] += 1
-                else:
-                    stats["empty_count"] += 1
-
-        # Calculate age statistics if populations exist
-        if stats["human_count"] > 0:
-            stats["avg_human_age"] = sum(stats["human_ages"]) / stats["human_count"]
-            stats["max_human_age"] = max(stats["human_ages"]) if stats["human_ages"] else 0
-        else:
-            stats["avg_human_age"] = 0
-            stats["max_human_age"] = 0
-
-        if stats["vampire_count"] > 0:
-            stats["avg_vampire_age"] = sum(stats["vampire_ages"]) / stats["vampire_count"]
-            stats["max_vampire_age"] = max(stats["vampire_ages"]) if stats["vampire_ages"] else 0
-        else:
-            stats["avg_vampire_age"] = 0
-            stats["max_vampire_age"] = 0
-
-        return stats
+        return self.population.get_stats()
 
     def add_pattern(self, pattern, x_offset, y_offset):
         """Add a predefined pattern to the grid"""
+        if self.recorder is not None:
+            self.recorder.add_pattern(pattern, x_offset, y_offset)
         for y, row in enumerate(pattern):
             for x, cell_value in enumerate(row):
                 grid_x = (x + x_offset) % self.width
                 grid_y = (y + y_offset) % self.height
-                self.cells[grid_x][grid_y].cell_type = cell_value
-                self.cells[grid_x][grid_y].next_state = cell_value
\ No newline at end of file
+                self.record_edit(grid_x, grid_y, cell_type=cell_value)
+                self.cell_types[grid_x, grid_y] = cell_value
+                self.mark_dirty(grid_x, grid_y)
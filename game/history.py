@@ -0,0 +1,149 @@
+import zlib
+from collections import deque
+import numpy as np
+from game.entities import Cell
+from game.grid import Grid
+
+
+class History:
+    """Bounded rewind history of grid states, stored as compressed keyframes and sparse deltas
+
+    Every keyframe_interval generations the full (cell_types, ages, hunger)
+    arrays are kept; the generations in between only keep the cells that
+    differ from what plain ageing of the previous generation predicts, which
+    is usually just the cells that changed type. Whole keyframe groups are
+    evicted oldest first once the compressed data exceeds memory_limit bytes.
+    """
+
+    def __init__(self, keyframe_interval, memory_limit, level=1):
+        self.keyframe_interval = keyframe_interval
+        self.memory_limit = memory_limit
+        self.level = level
+        # Each group is [first generation, keyframe, deltas of the following generations]
+        self._groups = deque()
+        self._previous = None  # Arrays of the last recorded generation, the base of the next delta
+        self._continues = False  # Whether the next generation may be stored as a delta
+        self.nbytes = 0
+
+    def __len__(self):
+        return sum(1 + len(deltas) for _, _, deltas in self._groups)
+
+    @property
+    def first(self):
+        """Oldest generation that can still be restored, or None"""
+        return self._groups[0][0] if self._groups else None
+
+    @property
+    def last(self):
+        """Newest recorded generation, or None"""
+        if not self._groups:
+            return None
+        start, _, deltas = self._groups[-1]
+        return start + len(deltas)
+
+    def clear(self):
+        """Forget every recorded generation"""
+        self._groups.clear()
+        self._previous = None
+        self._continues = False
+        self.nbytes = 0
+
+    @staticmethod
+    def _predict(cell_types, ages, hunger):
+        """Ages and hunger one generation on if no cell changed type"""
+        occupied = cell_types != Cell.EMPTY
+        next_ages = (ages + (ages < np.iinfo(ages.dtype).max)) * occupied
+        vampires = cell_types == Cell.VAMPIRE
+        next_hunger = (hunger + (hunger < np.iinfo(hunger.dtype).max)) * vampires
+        return next_ages.astype(ages.dtype, copy=False), next_hunger.astype(hunger.dtype, copy=False)
+
+    def _compress(self, *arrays):
+        return zlib.compress(b"".join(array.tobytes() for array in arrays), self.level)
+
+    def record(self, generation, cell_types, ages, hunger, clock, base=None, positions=None):
+        """Store the state of a generation along with its (is_day, day_time) clock
+
+        Recording a generation that is not newer than the last one discards the
+        history from that generation on, as after rewinding and stepping again.
+        base optionally gives the arrays of the last recorded generation, kept by
+        the caller (such as a grid's back buffers), so no copy of them is stored;
+        without it the next generation is a keyframe. positions optionally gives
+        the flat indices outside which every cell kept its type and only aged.
+        """
+        if self.memory_limit <= 0:
+            return
+        if self._groups and generation <= self.last:
+            self._truncate(generation)
+
+        previous = self._previous if base is None else base
+        if (not self._continues or previous is None or generation != self.last + 1 or
+                previous[0].shape != cell_types.shape or
+                generation - self._groups[-1][0] >= self.keyframe_interval):
+            keyframe = (cell_types.shape, clock, self._compress(cell_types, ages, hunger))
+            self._groups.append([generation, keyframe, []])
+            self.nbytes += len(keyframe[2])
+        else:
+            # Cells that changed type, plus any whose age or hunger did not follow the prediction
+            current = (cell_types, ages, hunger)
+            if positions is not None:
+                previous = [array.ravel()[positions] for array in previous]
+                current = [array.ravel()[positions] for array in current]
+            previous_types, previous_ages, previous_hunger = previous
+            predicted_ages, predicted_hunger = self._predict(previous_types, previous_ages, previous_hunger)
+            changed = (current[0] != previous_types) | (current[1] != predicted_ages) | (current[2] != predicted_hunger)
+            positions = np.flatnonzero(changed) if positions is None else positions[changed.ravel()]
+            # Gaps between sorted positions compress far better than the positions themselves
+            gaps = np.diff(positions, prepend=0).astype(np.uint32)
+            delta = (positions.size, clock, self._compress(
+                gaps, cell_types.ravel()[positions], ages.ravel()[positions], hunger.ravel()[positions]))
+            self._groups[-1][2].append(delta)
+            self.nbytes += len(delta[2])
+
+        self._previous = (cell_types.copy(), ages.copy(), hunger.copy()) if base is None else None
+        self._continues = True
+        while self.nbytes > self.memory_limit and len(self._groups) > 1:
+            _, keyframe, deltas = self._groups.popleft()
+            self.nbytes -= len(keyframe[2]) + sum(len(delta[2]) for delta in deltas)
+
+    def _truncate(self, generation):
+        """Drop every generation from the given one on"""
+        while self._groups and self._groups[-1][0] >= generation:
+            _, keyframe, deltas = self._groups.pop()
+            self.nbytes -= len(keyframe[2]) + sum(len(delta[2]) for delta in deltas)
+        if self._groups:
+            deltas = self._groups[-1][2]
+            keep = generation - self._groups[-1][0] - 1
+            self.nbytes -= sum(len(delta[2]) for delta in deltas[keep:])
+            del deltas[keep:]
+        # The next record must start a keyframe, since the stored base is gone
+        self._previous = None
+        self._continues = False
+
+    def seek(self, generation):
+        """Rebuild a recorded generation from its keyframe, returning (cell_types, ages, hunger, clock) or None"""
+        group = next((group for group in self._groups
+                      if group[0] <= generation <= group[0] + len(group[2])), None)
+        if group is None:
+            return None
+        start, (shape, clock, data), deltas = group
+
+        cells = shape[0] * shape[1]
+        type_size = np.dtype(Grid.TYPE_DTYPE).itemsize
+        age_size = np.dtype(Grid.AGE_DTYPE).itemsize
+        raw = zlib.decompress(data)
+        cell_types = np.frombuffer(raw, dtype=Grid.TYPE_DTYPE, count=cells).copy()
+        ages = np.frombuffer(raw, dtype=Grid.AGE_DTYPE, count=cells, offset=cells * type_size).copy()
+        hunger = np.frombuffer(raw, dtype=Grid.HUNGER_DTYPE, count=cells,
+                               offset=cells * (type_size + age_size)).copy()
+
+        for count, clock, data in deltas[:generation - start]:
+            ages, hunger = self._predict(cell_types, ages, hunger)
+            raw = zlib.decompress(data)
+            positions = np.cumsum(np.frombuffer(raw, dtype=np.uint32, count=count), dtype=np.int64)
+            offset = count * np.dtype(np.uint32).itemsize
+            cell_types[positions] = np.frombuffer(raw, dtype=Grid.TYPE_DTYPE, count=count, offset=offset)
+            offset += count * type_size
+            ages[positions] = np.frombuffer(raw, dtype=Grid.AGE_DTYPE, count=count, offset=offset)
+            offset += count * age_size
+            hunger[positions] = np.frombuffer(raw, dtype=Grid.HUNGER_DTYPE, count=count, offset=offset)
+        return cell_types.reshape(shape), ages.reshape(shape), hunger.reshape(shape), clock
@@ -0,0 +1,271 @@
+import argparse
+import multiprocessing
+import time
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+from game.array_engine import ArrayEngine
+from game.entities import Cell
+
+
+def _attach(name):
+    """Attach to a shared-memory block owned (and eventually unlinked) by the parent process"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 workers share the parent's resource tracker, so tracking is harmless
+        return shared_memory.SharedMemory(name=name)
+
+
+def _strip_worker(connection, names, shape, dtypes, bounds, axis):
+    """Worker loop: step one strip of the torus from the front buffers into the back buffers"""
+    from utils.config import Config
+
+    blocks = [_attach(name) for name in names]
+    arrays = [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+              for block, dtype in zip(blocks, dtypes + dtypes)]
+    if axis == 1:
+        # Stepping horizontal strips is the same as stepping vertical strips of the transpose
+        arrays = [array.T for array in arrays]
+    buffers = (arrays[:3], arrays[3:])
+    start, stop = bounds
+    extent = arrays[0].shape[0]
+
+    config = Config()
+    engine = ArrayEngine(config)
+    # Own rows plus a one-cell halo read from the neighbouring strips, wrapping around the torus
+    halo_rows = np.arange(start - 1, stop + 1) % extent
+
+    try:
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            is_day, rules, front = message
+            if rules is not None:
+                config.rules = rules
+            _step_strip(engine, buffers[front], buffers[1 - front], start, stop, halo_rows, is_day)
+            connection.send(True)
+    finally:
+        del buffers, arrays
+        for block in blocks:
+            block.close()
+
+
+def _step_strip(engine, front, back, start, stop, halo_rows, is_day):
+    """Compute the next generation of rows start:stop from the front buffers into the back buffers"""
+    cell_types, ages, hunger = (array[start:stop] for array in front)
+    window = front[0][halo_rows]
+    human_neighbors = engine.count_strip_neighbors(window, Cell.HUMAN)
+    vampire_neighbors = engine.count_strip_neighbors(window, Cell.VAMPIRE)
+
+    next_types, fed_hunger = engine.next_states(
+        cell_types, ages, hunger, human_neighbors, vampire_neighbors, is_day)
+    next_types, next_ages, next_hunger = engine.apply(cell_types, ages, fed_hunger, next_types)
+
+    back[0][start:stop] = next_types
+    back[1][start:stop] = next_ages
+    back[2][start:stop] = next_hunger
+
+
+def _detach_grids(grids):
+    """Give attached grids arrays of their own again, before the shared memory under them is freed"""
+    for grid in grids:
+        grid.use_buffers()
+    grids.clear()
+
+
+def _shutdown(connections, processes, blocks, grids):
+    """Stop the workers and release the shared memory"""
+    _detach_grids(grids)
+    for connection in connections:
+        try:
+            connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+    for process in processes:
+        process.join(timeout=1)
+        if process.is_alive():
+            process.terminate()
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+class ParallelEngine:
+    """Steps the torus as strips in worker processes over multiprocessing.shared_memory buffers
+
+    attach() moves a grid's front and back buffers into the shared memory, so a
+    step only sends the workers which set is the front one and the grid swaps
+    its buffers as usual; arrays that live elsewhere are copied in and out.
+    """
+
+    def __init__(self, config, workers=None, strips=None):
+        self.config = config
+        self.workers = workers or config.SIMULATION_WORKERS
+        self.strips = strips or config.STRIP_ORIENTATION
+        if self.strips not in ("vertical", "horizontal"):
+            raise ValueError(f"Unknown strip orientation: {self.strips}")
+
+        self.shape = None
+        self._buffers = []
+        self._connections = []
+        self._rules_sent = None
+        self._finalizer = None
+        self._grids = []  # The grid using the shared buffers, if any
+
+    def _start(self, shape, dtypes):
+        """Allocate shared buffers for a grid shape and start one worker per strip"""
+        self.close()
+        self.shape = shape
+
+        blocks = []
+        for _ in range(2):
+            for dtype in dtypes:
+                size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+                blocks.append(shared_memory.SharedMemory(create=True, size=size))
+        arrays = [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+                  for block, dtype in zip(blocks, dtypes + dtypes)]
+        self._buffers = [tuple(arrays[:3]), tuple(arrays[3:])]
+
+        # Vertical strips split x (axis 0), horizontal strips split y (axis 1)
+        axis = 0 if self.strips == "vertical" else 1
+        extent = shape[axis]
+        count = max(1, min(self.workers, extent))
+        edges = np.linspace(0, extent, count + 1).astype(int)
+
+        context = multiprocessing.get_context()
+        processes = []
+        self._connections = []
+        for start, stop in zip(edges[:-1], edges[1:]):
+            parent_end, child_end = context.Pipe()
+            process = context.Process(
+                target=_strip_worker,
+                args=(child_end, [block.name for block in blocks], shape, dtypes, (int(start), int(stop)), axis),
+                daemon=True
+            )
+            process.start()
+            child_end.close()
+            processes.append(process)
+            self._connections.append(parent_end)
+
+        self._rules_sent = None
+        self._finalizer = weakref.finalize(self, _shutdown, self._connections, processes, blocks, self._grids)
+
+    def _ensure_started(self, shape, dtypes):
+        if self.shape != shape or [array.dtype for array in self._buffers[0]] != dtypes:
+            self._start(shape, dtypes)
+
+    def _buffer_index(self, arrays):
+        """Which shared set the arrays are, or None"""
+        for index, shared in enumerate(self._buffers):
+            if all(array is other for array, other in zip(arrays, shared)):
+                return index
+        return None
+
+    def attach(self, grid):
+        """Keep the grid's front and back buffers in shared memory so steps need no copies"""
+        if grid in self._grids and self._buffer_index((grid.cell_types, grid.ages, grid.hunger)) is not None:
+            return
+        self._ensure_started(grid.cell_types.shape, [grid.cell_types.dtype, grid.ages.dtype, grid.hunger.dtype])
+        _detach_grids(self._grids)
+        grid.use_buffers(self._buffers)
+        self._grids.append(grid)
+
+    def step(self, cell_types, ages, hunger, is_day, out=None):
+        """Compute the next generation in the workers, returning new (cell_types, ages, hunger) arrays
+
+        out optionally gives three arrays to write the generation into instead. For an
+        attached grid's front and back buffers the workers read and write them in place.
+        """
+        arrays = (cell_types, ages, hunger)
+        front = self._buffer_index(arrays)
+        if front is None:
+            self._ensure_started(cell_types.shape, [array.dtype for array in arrays])
+            _detach_grids(self._grids)  # The shared buffers are about to be overwritten
+            front = 0
+            for shared, array in zip(self._buffers[front], arrays):
+                np.copyto(shared, array)
+
+        # Workers only need the rules again after they change
+        rules_key = repr(self.config.rules)
+        rules = self.config.rules if rules_key != self._rules_sent else None
+        self._rules_sent = rules_key
+
+        for connection in self._connections:
+            connection.send((is_day, rules, front))
+        for connection in self._connections:
+            try:
+                connection.recv()
+            except EOFError:
+                self.close()
+                raise RuntimeError("Simulation worker process exited unexpectedly")
+
+        back = self._buffers[1 - front]
+        if out is None:
+            return tuple(array.copy() for array in back)
+        for array, shared in zip(out, back):
+            if array is not shared:
+                np.copyto(array, shared)
+        return out
+
+    def close(self):
+        """Stop the worker processes and free the shared buffers, first giving an attached grid its own arrays"""
+        # Drop the array views first so the shared blocks can be closed
+        _detach_grids(self._grids)
+        self.shape = None
+        self._buffers = []
+        self._connections = []
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+
+
+def measure_scaling(size, max_workers, steps, strips="vertical", seed=1):
+    """Time the parallel engine for 1..max_workers workers against the in-process NumPy engine"""
+    from utils.config import Config
+    from game.grid import Grid
+    import random
+
+    config = Config()
+    config.GRID_WIDTH = config.GRID_HEIGHT = size
+
+    def make_grid():
+        random.seed(seed)
+        grid = Grid(config)
+        grid.random_populate()
+        return grid
+
+    def run(engine, grid):
+        """Seconds per generation, stepping into the back buffers and swapping like Simulation"""
+        start = time.perf_counter()
+        for _ in range(steps):
+            engine.step(grid.cell_types, grid.ages, grid.hunger, True, out=grid.back_buffers)
+            grid.swap_buffers()
+        return (time.perf_counter() - start) / steps
+
+    results = [("numpy", 0, run(ArrayEngine(config), make_grid()))]
+    for workers in range(1, max_workers + 1):
+        engine = ParallelEngine(config, workers=workers, strips=strips)
+        grid = make_grid()
+        engine.attach(grid)  # Starts the workers
+        results.append(("parallel", workers, run(engine, grid)))
+        engine.close()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure strip-parallel stepping scaling")
+    parser.add_argument("--size", type=int, default=2000, help="grid width and height in cells")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="largest worker count")
+    parser.add_argument("--steps", type=int, default=20, help="generations timed per configuration")
+    parser.add_argument("--strips", choices=["vertical", "horizontal"], default="vertical")
+    args = parser.parse_args()
+
+    timings = measure_scaling(args.size, args.workers, args.steps, args.strips)
+    baseline = timings[0][2]
+    print(f"{args.size}x{args.size} grid, {args.steps} steps, {args.strips} strips")
+    print(f"{'engine':<10}{'workers':>8}{'ms/step':>10}{'speedup':>9}")
+    for name, workers, seconds in timings:
+        print(f"{name:<10}{workers:>8}{seconds * 1000:>10.1f}{baseline / seconds:>8.2f}x")
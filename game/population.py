@@ -0,0 +1,159 @@
+import numpy as np
+from game.entities import Cell
+
+
+class PopulationCounter:
+    """Per-type cell counts, age sums and age maxima kept current as a grid changes
+
+    Edits and windowed steps update the totals in place. Whatever cannot be
+    updated exactly (a whole-grid step, or the oldest cell of a type leaving a
+    stepped region) is recomputed from the grid the next time it is read, so a
+    full scan happens at most once per generation. Those scans only bound the
+    maxima from above, and the per-type maxima are scanned for when read.
+    """
+    TYPES = Cell.BUNKER + 1
+
+    def __init__(self, tally_all, age_max):
+        self._tally_all = tally_all  # Returns tally() of the whole grid, taking its exact flag
+        self.age_max = age_max
+        self._counts = np.zeros(self.TYPES, dtype=np.int64)
+        self._age_sums = np.zeros(self.TYPES, dtype=np.int64)
+        self._age_maxima = np.zeros(self.TYPES, dtype=np.int64)
+        self._stale = True
+        # While set, the stored maximum is only an upper bound for that type
+        self._maxima_stale = np.zeros(self.TYPES, dtype=bool)
+
+    @classmethod
+    def tally(cls, cell_types, ages, exact=True):
+        """Count cells and sum and maximise their ages per type; empty cells carry no age
+
+        Without exact, every type present gets the oldest age of any cell as its
+        maximum, an upper bound that spares a pass over the grid per type.
+        """
+        cell_types = np.ravel(cell_types)
+        ages = np.ravel(ages)
+        counts = np.bincount(cell_types, minlength=cls.TYPES).astype(np.int64)
+        sums = np.bincount(cell_types, weights=ages, minlength=cls.TYPES).astype(np.int64)
+        sums[Cell.EMPTY] = 0
+        maxima = np.zeros(cls.TYPES, dtype=np.int64)
+        if not exact:
+            maxima[counts > 0] = ages.max() if ages.size else 0
+        else:
+            # One masked max per type; np.maximum.at is unbuffered and far slower on whole grids
+            for cell_type in range(Cell.EMPTY + 1, cls.TYPES):
+                if counts[cell_type]:
+                    maxima[cell_type] = ages[cell_types == cell_type].max()
+        maxima[Cell.EMPTY] = 0
+        return counts, sums, maxima
+
+    @classmethod
+    def combine(cls, tallies):
+        """Merge the tallies of separate regions"""
+        counts = np.zeros(cls.TYPES, dtype=np.int64)
+        sums = np.zeros(cls.TYPES, dtype=np.int64)
+        maxima = np.zeros(cls.TYPES, dtype=np.int64)
+        for region_counts, region_sums, region_maxima in tallies:
+            counts += region_counts
+            sums += region_sums
+            np.maximum(maxima, region_maxima, out=maxima)
+        return counts, sums, maxima
+
+    def clear(self, cells):
+        """Reset to a grid of the given number of empty cells"""
+        self._counts.fill(0)
+        self._counts[Cell.EMPTY] = cells
+        self._age_sums.fill(0)
+        self._age_maxima.fill(0)
+        self._maxima_stale.fill(False)
+        self._stale = False
+
+    def invalidate(self):
+        """Recompute everything from the grid on the next read"""
+        self._stale = True
+
+    def _refresh(self, exact=False):
+        self._counts, self._age_sums, self._age_maxima = self._tally_all(exact)
+        self._maxima_stale = self._age_maxima > 0 if not exact else np.zeros(self.TYPES, dtype=bool)
+        self._stale = False
+
+    def resize(self, cells):
+        """Account for empty cells added to (or, if negative, removed from) the grid"""
+        self._counts[Cell.EMPTY] += cells
+
+    def edit(self, old_type, old_age, new_type, new_age):
+        """Account for one cell changing type and/or age"""
+        if self._stale:
+            return
+        if old_type != Cell.EMPTY:
+            self._age_sums[old_type] -= old_age
+            if old_age >= self._age_maxima[old_type]:
+                self._maxima_stale[old_type] = True
+        self._counts[old_type] -= 1
+        if self._counts[old_type] == 0:
+            self._age_maxima[old_type] = 0
+            self._maxima_stale[old_type] = False
+
+        self._counts[new_type] += 1
+        if new_type != Cell.EMPTY:
+            self._age_sums[new_type] += new_age
+            self._age_maxima[new_type] = max(self._age_maxima[new_type], new_age)
+
+    def advance(self, before, after):
+        """Account for a step that re-evaluated one region and only aged the cells outside it
+
+        before and after are tally() results of the region before and after the step.
+        """
+        if self._stale:
+            return
+        before_counts, before_sums, before_maxima = before
+        after_counts, after_sums, after_maxima = after
+
+        outside = self._counts - before_counts
+        aged = outside.copy()
+        aged[Cell.EMPTY] = 0
+        # Saturated ages stop growing, so the simple update no longer holds
+        if (self._age_maxima[aged > 0] >= self.age_max).any():
+            self.invalidate()
+            return
+
+        # The oldest cell outside the region is only known when the region did not hold the maximum
+        outside_maxima = np.where(aged > 0, self._age_maxima + 1, 0)
+        uncertain = (aged > 0) & (self._maxima_stale | (before_maxima >= self._age_maxima))
+
+        self._counts = outside + after_counts
+        self._age_sums = self._age_sums - before_sums + aged + after_sums
+        self._age_maxima = np.maximum(outside_maxima, after_maxima)
+        self._maxima_stale = uncertain & (after_maxima < outside_maxima)
+
+    @property
+    def counts(self):
+        """Cells of each type, indexed by cell type"""
+        if self._stale:
+            self._refresh()
+        return self._counts.copy()
+
+    def average_age(self, cell_type):
+        if self._stale:
+            self._refresh()
+        count = self._counts[cell_type]
+        return int(self._age_sums[cell_type]) / int(count) if count else 0
+
+    def max_age(self, cell_type):
+        if self._stale or self._maxima_stale[cell_type]:
+            self._refresh(exact=True)
+        return int(self._age_maxima[cell_type])
+
+    def get_stats(self):
+        """Population counts and age statistics in the Grid.get_population_stats format"""
+        counts = self.counts
+        return {
+            "human_count": int(counts[Cell.HUMAN]),
+            "vampire_count": int(counts[Cell.VAMPIRE]),
+            "empty_count": int(counts[Cell.EMPTY]),
+            "forest_count": int(counts[Cell.FOREST]),
+            "bunker_count": int(counts[Cell.BUNKER]),
+            "avg_human_age": self.average_age(Cell.HUMAN),
+            "max_human_age": self.max_age(Cell.HUMAN),
+            "avg_vampire_age": self.average_age(Cell.VAMPIRE),
+            "max_vampire_age": self.max_age(Cell.VAMPIRE)
+        }
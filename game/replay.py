@@ -0,0 +1,230 @@
+"""
+Deterministic session logs for the vampire game of life.
+
+A ReplayLog records everything that decides how an interactive session
+evolves: the seed of every random population, every set_cell/add_pattern
+edit, loaded saves, rewinds, and changes to the speed, day length and rules.
+Steps taken while the simulation runs are not stored; each record carries the
+generation it happened at, and a Replayer steps up to it before applying the
+record. Checksums of the grid every REPLAY_SYNC_INTERVAL generations let a
+replay verify that it reproduces the session exactly.
+
+Replay a log headlessly with:
+    python -m game.run --replay replays/session_20240101_120000.vcr
+"""
+
+import datetime
+import json
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from game.grid import Grid
+from game.simulation import Simulation
+
+MAGIC = b"VCREPLAY1\n"
+HEADER = struct.Struct("<IIIQ")  # Grid width, height, history keyframe interval and memory limit
+RECORD = struct.Struct("<IBI")  # Generation, event, payload length
+
+# Events
+SEED = 0  # Grid.random_populate with a seed and the four ratios
+CELL = 1  # Grid.set_cell
+PATTERN = 2  # Grid.add_pattern
+PAUSE = 3  # Pause or resume; informational, since running steps are implied
+STEP = 4  # Manual single step
+SPEED = 5  # Simulation speed, which sets the clock advance per generation
+SETTINGS = 6  # Day length and rules
+SEEK = 7  # Simulation.seek through the rewind history
+LOAD = 8  # A loaded world, stored whole
+SYNC = 9  # Checksum of the grid arrays
+END = 10  # End of the session
+
+SEED_PAYLOAD = struct.Struct("<I4d")
+CELL_PAYLOAD = struct.Struct("<iiB")
+PATTERN_HEADER = struct.Struct("<iiHH")
+LOAD_HEADER = struct.Struct("<Bd")
+
+
+def checksum(grid):
+    """CRC of the grid's cell arrays"""
+    value = 0
+    for array in (grid.cell_types, grid.ages, grid.hunger):
+        value = zlib.crc32(np.ascontiguousarray(array).tobytes(), value)
+    return value
+
+
+def _settings(config):
+    return json.dumps({"DAY_DURATION": config.DAY_DURATION, "rules": config.rules}, sort_keys=True)
+
+
+class ReplayLog:
+    """Append-only recorder for one interactive session"""
+
+    def __init__(self, path, config):
+        self.path = path
+        self.config = config
+        self.simulation = None
+        self._speed = None
+        self._settings = None
+        self._file = open(path, "wb")
+        self._file.write(MAGIC + HEADER.pack(config.GRID_WIDTH, config.GRID_HEIGHT,
+                                             config.HISTORY_KEYFRAME_INTERVAL, config.HISTORY_MEMORY_LIMIT))
+        self._file.flush()
+
+    @classmethod
+    def start(cls, config):
+        """Open a new timestamped log in config.REPLAY_FOLDER"""
+        os.makedirs(config.REPLAY_FOLDER, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        return cls(os.path.join(config.REPLAY_FOLDER, f"session_{timestamp}.vcr"), config)
+
+    def _write(self, event, payload=b""):
+        if self._file is None:
+            return
+        generation = self.simulation.generation if self.simulation is not None else 0
+        self._file.write(RECORD.pack(generation, event, len(payload)) + payload)
+        self._file.flush()
+
+    def attach(self, grid, simulation):
+        """Record edits to a grid, keyed by the generations of its simulation"""
+        grid.recorder = self
+        self.simulation = simulation
+
+    def random_populate(self, seed, ratios):
+        self._write(SEED, SEED_PAYLOAD.pack(seed, *ratios))
+
+    def set_cell(self, x, y, cell_type):
+        self._write(CELL, CELL_PAYLOAD.pack(x, y, cell_type))
+
+    def add_pattern(self, pattern, x_offset, y_offset):
+        cells = np.array(pattern, dtype=Grid.TYPE_DTYPE)
+        rows, cols = cells.shape
+        self._write(PATTERN, PATTERN_HEADER.pack(x_offset, y_offset, rows, cols) + cells.tobytes())
+
+    def pause(self, paused):
+        self._write(PAUSE, bytes([paused]))
+
+    def step(self):
+        self._write(STEP)
+
+    def seek(self, generation):
+        self._write(SEEK, struct.pack("<I", generation))
+
+    def load(self, grid, simulation):
+        """Record a loaded world whole and follow its edits from now on"""
+        self.attach(grid, simulation)
+        arrays = zlib.compress(grid.cell_types.tobytes() + grid.ages.tobytes() + grid.hunger.tobytes())
+        self._write(LOAD, LOAD_HEADER.pack(simulation.is_day, simulation.day_time) + arrays)
+
+    def sync(self, speed):
+        """Record speed and settings changes; called before every generation is stepped"""
+        if speed != self._speed:
+            self._speed = speed
+            self._write(SPEED, struct.pack("<d", speed))
+        settings = _settings(self.config)
+        if settings != self._settings:
+            self._settings = settings
+            self._write(SETTINGS, settings.encode())
+
+    def stepped(self):
+        """Write a checksum every REPLAY_SYNC_INTERVAL generations"""
+        if self.simulation.generation % self.config.REPLAY_SYNC_INTERVAL == 0:
+            self._write(SYNC, struct.pack("<I", checksum(self.simulation.grid)))
+
+    def close(self):
+        if self._file is not None:
+            self._write(END)
+            self._file.close()
+            self._file = None
+
+
+class Replayer:
+    """Re-executes a ReplayLog headlessly"""
+
+    def __init__(self, path, config, engine=None):
+        self.config = config
+        self.engine = engine
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(MAGIC):
+            raise ValueError(f"Not a replay log: {path}")
+        offset = len(MAGIC)
+        (config.GRID_WIDTH, config.GRID_HEIGHT,
+         config.HISTORY_KEYFRAME_INTERVAL, config.HISTORY_MEMORY_LIMIT) = HEADER.unpack_from(data, offset)
+        self._data = data
+        self._offset = offset + HEADER.size
+
+        self.speed = config.DEFAULT_SIMULATION_SPEED
+        self.grid = Grid(config)
+        self.simulation = Simulation(self.grid, config, engine=engine)
+
+    def records(self):
+        """Yield (generation, event, payload) for every complete record"""
+        data = self._data
+        offset = self._offset
+        while offset + RECORD.size <= len(data):
+            generation, event, length = RECORD.unpack_from(data, offset)
+            offset += RECORD.size
+            if offset + length > len(data):
+                break  # Cut off mid-record, as by a crash
+            yield generation, event, data[offset:offset + length]
+            offset += length
+
+    def _advance(self):
+        """Step one generation exactly as GameScreen does"""
+        self.simulation.step()
+        self.simulation.update(1.0 / self.speed)
+
+    def run(self):
+        """Replay the log, yielding the generation number after every generation"""
+        for generation, event, payload in self.records():
+            while self.simulation.generation < generation:
+                self._advance()
+                yield self.simulation.generation
+
+            if event == SEED:
+                seed, *ratios = SEED_PAYLOAD.unpack(payload)
+                self.grid.random_populate(*ratios, seed=seed)
+            elif event == CELL:
+                self.grid.set_cell(*CELL_PAYLOAD.unpack(payload))
+            elif event == PATTERN:
+                x_offset, y_offset, rows, cols = PATTERN_HEADER.unpack_from(payload)
+                cells = np.frombuffer(payload, dtype=Grid.TYPE_DTYPE, offset=PATTERN_HEADER.size)
+                self.grid.add_pattern(cells.reshape(rows, cols).tolist(), x_offset, y_offset)
+            elif event == STEP:
+                self._advance()
+                yield self.simulation.generation
+            elif event == SPEED:
+                self.speed = struct.unpack("<d", payload)[0]
+            elif event == SETTINGS:
+                settings = json.loads(payload)
+                self.config.DAY_DURATION = settings["DAY_DURATION"]
+                self.config.rules = settings["rules"]
+            elif event == SEEK:
+                self.simulation.seek(struct.unpack("<I", payload)[0])
+            elif event == LOAD:
+                self._load(payload)
+            elif event == SYNC:
+                if struct.unpack("<I", payload)[0] != checksum(self.grid):
+                    raise ValueError(f"Replay diverged from the recorded session at generation {generation}")
+            elif event == END:
+                break
+
+    def _load(self, payload):
+        is_day, day_time = LOAD_HEADER.unpack_from(payload)
+        arrays = zlib.decompress(payload[LOAD_HEADER.size:])
+        self.simulation.close()
+        self.grid = Grid(self.config)
+        self.simulation = Simulation(self.grid, self.config, engine=self.engine)
+        self.simulation.is_day = bool(is_day)
+        self.simulation.day_time = day_time
+
+        offset = 0
+        for array in (self.grid.cell_types, self.grid.ages, self.grid.hunger):
+            size = array.nbytes
+            array[:] = np.frombuffer(arrays, dtype=array.dtype, count=array.size, offset=offset).reshape(array.shape)
+            offset += size
+        self.grid.population.invalidate()
+        self.grid.mark_all_dirty()
@@ -0,0 +1,128 @@
+import math
+import numpy as np
+from game.entities import Cell
+
+
+def _next_state(human, vampire, cell_type, human_neighbors, vampire_neighbors, wise, sunburnt, starved):
+    """Apply the rules to one combination of cell type, neighbour counts and age/hunger thresholds"""
+    if cell_type == Cell.EMPTY:
+        # Human reproduction takes precedence and is blocked by fear of vampires
+        if human_neighbors == human["reproduce"]:
+            if vampire_neighbors <= human["fear_threshold"]:
+                return Cell.HUMAN
+        elif vampire_neighbors == vampire["reproduce"]:
+            return Cell.VAMPIRE
+        return Cell.EMPTY
+
+    if cell_type == Cell.HUMAN:
+        # Older humans and defended groups are harder to convert
+        vulnerability = human["base_vulnerability"]
+        if wise:
+            vulnerability *= human["wisdom_resistance"]
+        if human_neighbors >= human["defense_threshold"]:
+            vulnerability *= human["group_resistance"]
+
+        if vulnerability * vampire_neighbors >= human["convert_threshold"]:
+            return Cell.VAMPIRE
+        if human_neighbors < human["survive_min"] or human_neighbors > human["survive_max"]:
+            return Cell.EMPTY
+        return Cell.HUMAN
+
+    if cell_type == Cell.VAMPIRE:
+        # Feeding protects from sunlight and starvation
+        has_fed = human_neighbors > 0
+        if (sunburnt or starved) and not has_fed:
+            return Cell.EMPTY
+        if vampire_neighbors < vampire["survive_min"] or vampire_neighbors > vampire["survive_max"]:
+            return Cell.EMPTY
+        return Cell.VAMPIRE
+
+    return cell_type  # Forests and bunkers never change
+
+
+class RuleTable:
+    """Next-state lookup table compiled from the day or night ruleset
+
+    Indexed by (cell type, human neighbours, vampire neighbours, age bucket,
+    hunger bucket). Age buckets split ages wherever the wisdom or sunlight
+    rules change outcome; the hunger bucket is whether the starvation
+    threshold has been reached.
+    """
+    NEIGHBOR_COUNTS = 9
+
+    def __init__(self, ruleset, is_day):
+        human = ruleset["human"]
+        vampire = ruleset["vampire"]
+        self.hunger_threshold = vampire["hunger_threshold"]
+
+        # Every age-dependent outcome is settled once past both the wisdom age and full sunlight resistance
+        self.age_limit = max(math.floor(human["wisdom_age"]) + 1, math.ceil(vampire["age_resistance"]), 0) + 1
+        features = []
+        for age in range(self.age_limit + 1):
+            sunburnt = False
+            if is_day and vampire["die_in_sunlight"]:
+                sunlight_resistance = min(age / vampire["age_resistance"], 1)
+                sunburnt = vampire["sunlight_mortality"] * (1 - sunlight_resistance) > 0.5
+            features.append((age > human["wisdom_age"], sunburnt))
+
+        # Consecutive ages with the same outcomes share a bucket
+        bucket_features = []
+        age_buckets = []
+        for feature in features:
+            if not bucket_features or bucket_features[-1] != feature:
+                bucket_features.append(feature)
+            age_buckets.append(len(bucket_features) - 1)
+        self.age_buckets = np.array(age_buckets, dtype=np.intp)
+        self._age_bucket_list = age_buckets
+
+        counts = self.NEIGHBOR_COUNTS
+        self.transitions = np.zeros((Cell.BUNKER + 1, counts, counts, len(bucket_features), 2), dtype=np.uint8)
+        for cell_type in range(Cell.BUNKER + 1):
+            for human_neighbors in range(counts):
+                for vampire_neighbors in range(counts):
+                    for bucket, (wise, sunburnt) in enumerate(bucket_features):
+                        for starved in (False, True):
+                            self.transitions[cell_type, human_neighbors, vampire_neighbors, bucket, int(starved)] = \
+                                _next_state(human, vampire, cell_type, human_neighbors, vampire_neighbors,
+                                            wise, sunburnt, starved)
+
+        self._flat = self.transitions.ravel()
+        self._nested = self.transitions.tolist()
+
+    def next_state(self, cell_type, human_neighbors, vampire_neighbors, age, hunger):
+        """Look up the next state of a single cell"""
+        bucket = self._age_bucket_list[min(age, self.age_limit)]
+        starved = int(hunger >= self.hunger_threshold)
+        return self._nested[cell_type][human_neighbors][vampire_neighbors][bucket][starved]
+
+    def next_states(self, cell_types, human_neighbors, vampire_neighbors, ages, hunger, out=None):
+        """Look up the next state of every cell in equally shaped arrays, optionally into out"""
+        # Flat index into the C-ordered table, accumulated axis by axis
+        _, counts, _, buckets, _ = self.transitions.shape
+        index = cell_types.astype(np.intp)
+        index *= counts
+        index += human_neighbors
+        index *= counts
+        index += vampire_neighbors
+        index *= buckets
+        index += self.age_buckets[np.minimum(ages, self.age_limit)]
+        index *= 2
+        index += hunger >= self.hunger_threshold
+        return np.take(self._flat, index, out=out)
+
+
+class RuleTables:
+    """Day and night RuleTables for a config, recompiled whenever Config.rules changes"""
+
+    def __init__(self, config):
+        self.config = config
+        self._tables = {}
+
+    def get(self, is_day):
+        """Get the table for the current time of day"""
+        ruleset = self.config.rules["day"] if is_day else self.config.rules["night"]
+        key = repr(ruleset)
+        cached = self._tables.get(is_day)
+        if cached is None or cached[0] != key:
+            cached = self._tables[is_day] = (key, RuleTable(ruleset, is_day))
+        return cached[1]
@@ -0,0 +1,157 @@
+"""
+Headless batch runner for the vampire game of life.
+
+Steps a simulation as fast as the engine allows, without pygame or a display,
+counting the day/night cycle in generations instead of seconds. Writes one CSV
+row of statistics per generation and a final snapshot in the save file format.
+With --unbounded the population starts in a width x height area of an infinite
+world that grows in chunks as it spreads, instead of on a width x height torus.
+With --replay a session recorded by the game is re-executed instead, writing
+the same statistics and snapshot.
+
+Example:
+    python -m game.run --scenario village_raid --width 400 --height 300 --steps 5000 --seed 7
+    python -m game.run --replay replays/session_20240101_120000.vcr
+"""
+
+import argparse
+import csv
+import os
+import random
+import time
+
+from utils.config import Config
+from utils.save_load import SaveLoadManager
+from game.grid import Grid
+from game.chunked_grid import ChunkedGrid
+from game.simulation import Simulation
+from game.patterns import SCENARIOS, apply_scenario
+from game.replay import Replayer
+
+
+STAT_FIELDS = [
+    "generation", "is_day", "day_time",
+    "human_count", "vampire_count", "forest_count", "bunker_count", "empty_count",
+    "avg_human_age", "max_human_age", "avg_vampire_age", "max_vampire_age",
+    "active_fraction", "cycle_period"
+]
+
+
+def build_simulation(config, seed=None, scenario=None, engine=None, unbounded=False):
+    """Create a grid and simulation, seeded either from a scenario or a random population"""
+    random.seed(seed)
+    config.HISTORY_MEMORY_LIMIT = 0  # Headless runs never rewind
+    grid = ChunkedGrid(config) if unbounded else Grid(config)
+    if scenario is None:
+        grid.random_populate()
+    elif not apply_scenario(grid, scenario):
+        raise ValueError(f"Unknown scenario: {scenario}")
+    return Simulation(grid, config, engine=engine)
+
+
+def collect_statistics(simulation, generation):
+    """Build one statistics row for the current generation"""
+    stats = simulation.grid.get_population_stats()
+    row = {field: stats[field] for field in STAT_FIELDS if field in stats}
+    row["generation"] = generation
+    row["is_day"] = int(simulation.is_day)
+    row["day_time"] = simulation.day_time
+    row["active_fraction"] = round(simulation.active_fraction, 4)
+    row["cycle_period"] = simulation.cycle_period
+    return row
+
+
+def run_steps(simulation, steps, day_length, fast_forward=False):
+    """Step the simulation, yielding the generation number after every generation
+
+    The day/night clock advances by one unit per generation, so each phase lasts
+    day_length generations. With fast_forward, whole periods of a detected still
+    life or cycle are skipped up to the next day/night flip, so the yielded
+    generation numbers can jump.
+    """
+    simulation.config.DAY_DURATION = day_length
+    generation = 0
+    while generation < steps:
+        simulation.step()
+        skipped = 0
+        if fast_forward:
+            # Generations left in this phase after the one just stepped
+            remaining = min(steps - generation - 1, day_length - simulation.day_time - 1)
+            skipped = simulation.fast_forward(remaining)
+        simulation.update(1 + skipped)
+        generation += 1 + skipped
+        yield generation
+
+
+def main(argv=None):
+    config = Config()
+    parser = argparse.ArgumentParser(description="Run the vampire simulation headlessly")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for the initial population")
+    parser.add_argument("--width", type=int, default=config.GRID_WIDTH, help="grid width in cells")
+    parser.add_argument("--height", type=int, default=config.GRID_HEIGHT, help="grid height in cells")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default=None,
+                        help="predefined scenario (default: random population)")
+    parser.add_argument("--steps", type=int, default=1000, help="generations to simulate")
+    parser.add_argument("--day-length", type=int,
+                        default=config.DAY_DURATION * config.DEFAULT_SIMULATION_SPEED,
+                        help="generations per day or night phase")
+    parser.add_argument("--engine", choices=Simulation.ENGINES, default=config.SIMULATION_ENGINE)
+    parser.add_argument("--unbounded", action="store_true",
+                        help="simulate an infinite chunked world instead of a torus")
+    parser.add_argument("--output-dir", default="runs", help="directory for statistics and snapshot files")
+    parser.add_argument("--fast-forward", action="store_true",
+                        help="skip whole periods of still lifes and cycles up to the next day/night flip")
+    parser.add_argument("--stop-on-cycle", action="store_true",
+                        help="stop as soon as a still life or cycle is detected")
+    parser.add_argument("--progress", type=int, default=0, help="print progress every N generations")
+    parser.add_argument("--replay", metavar="LOG", default=None,
+                        help="re-execute a session log recorded by the game (grid options are taken from the log)")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    config.SAVE_FOLDER = args.output_dir
+
+    replayer = None
+    if args.replay:
+        replayer = Replayer(args.replay, config, args.engine)
+        name = os.path.splitext(os.path.basename(args.replay))[0] + "_replay"
+        simulation = replayer.simulation
+        generations = replayer.run()
+    else:
+        config.GRID_WIDTH = args.width
+        config.GRID_HEIGHT = args.height
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+        name = f"{args.scenario or 'random'}_{args.width}x{args.height}_seed{seed}"
+        if args.unbounded:
+            name += "_unbounded"
+        simulation = build_simulation(config, seed, args.scenario, args.engine, args.unbounded)
+        generations = run_steps(simulation, args.steps, args.day_length, args.fast_forward)
+
+    start = time.perf_counter()
+    with open(os.path.join(args.output_dir, f"{name}_stats.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=STAT_FIELDS)
+        writer.writeheader()
+        if replayer is None:
+            writer.writerow(collect_statistics(simulation, 0))
+        generation = 0
+        for generation in generations:
+            if replayer is not None:
+                simulation = replayer.simulation  # Replaced whenever the session loaded a save
+            row = collect_statistics(simulation, generation)
+            writer.writerow(row)
+            if args.progress and generation % args.progress == 0:
+                print(f"generation {generation}: {row['human_count']} humans, {row['vampire_count']} vampires")
+            if args.stop_on_cycle and simulation.cycle_period:
+                print(f"generation {generation}: cycle of period {simulation.cycle_period} detected, stopping")
+                break
+    elapsed = time.perf_counter() - start
+    if replayer is not None:
+        simulation = replayer.simulation
+    simulation.close()
+
+    SaveLoadManager(config).save_game(simulation.grid, simulation, filename=f"{name}_snapshot.json")
+    print(f"{generation} generations in {elapsed:.2f}s ({generation / max(elapsed, 1e-9):.1f} generations/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,77 @@
+import numpy as np
 from game.entities import Cell
+from game.array_engine import ArrayEngine
+from game.parallel_engine import ParallelEngine
+from game.bitplane_engine import BitPlaneEngine
+from game.population import PopulationCounter
+from game.rule_table import RuleTables
+from game.state_hash import StateHasher, CycleDetector
+from game.history import History
 
 
 class Simulation:
-    def __init__(self, grid, config):
+    ENGINES = ("python", "numpy", "parallel", "bitplane")
+
+    def __init__(self, grid, config, engine=None):
         self.grid = grid
         self.config = config
         self.is_day = True
         self.day_time = 0
-        self.vampire_hunger = [[0 for _ in range(grid.height)] for _ in range(grid.width)]
+
+        # Select the stepping engine ("python" walks cells one by one, "numpy" steps whole arrays,
+        # "parallel" steps strips of the arrays in worker processes, "bitplane" steps packed bit-planes)
+        self.engine = engine or config.SIMULATION_ENGINE
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Unknown simulation engine: {self.engine}")
+        if grid.UNBOUNDED and self.engine != "numpy":
+            raise ValueError("Unbounded worlds can only be stepped with the numpy engine")
+        # Compiled day/night transition tables, shared by the per-cell and array engines
+        self.rule_tables = RuleTables(config)
+        self.array_engine = ArrayEngine(config, self.rule_tables)
+        self.parallel_engine = ParallelEngine(config) if self.engine == "parallel" else None
+        self.bitplane_engine = BitPlaneEngine(config, self.rule_tables) if self.engine == "bitplane" else None
+        if self.parallel_engine is not None:
+            self.parallel_engine.attach(grid)  # Workers step the grid's own buffers in shared memory
+
+        # Dirty-tile tracking: the ruleset last stepped with and the share of cells evaluated
+        self._rules_key = None
+        self.active_fraction = 1.0
+
+        # State hashing for still life and cycle detection (bounded grids only)
+        self.generation = 0
+        self.state_hasher = StateHasher(self.rule_tables)
+        self.cycles = CycleDetector(config.CYCLE_HISTORY)
+
+        # Rewind history of recent generations (bounded grids only)
+        self.history = None
+        self._stepped_tiles = None  # Dirty tiles of the last array step, whose start the back buffers hold
+        if config.HISTORY_MEMORY_LIMIT > 0 and not grid.UNBOUNDED:
+            self.history = History(config.HISTORY_KEYFRAME_INTERVAL, config.HISTORY_MEMORY_LIMIT)
+
+    @property
+    def cycle_period(self):
+        """Period of the cycle the current ruleset has settled into (1 for a still life), or None"""
+        return self.cycles.period
+
+    @property
+    def vampire_hunger(self):
+        """Per-cell vampire hunger, stored on the grid next to the other cell arrays"""
+        return self.grid.hunger
+
+    @vampire_hunger.setter
+    def vampire_hunger(self, hunger):
+        hunger = np.asarray(hunger, dtype=self.grid.HUNGER_DTYPE)
+        width = min(hunger.shape[0], self.grid.width)
+        height = min(hunger.shape[1], self.grid.height)
+        self.grid.hunger[:width, :height] = hunger[:width, :height]
+        self.grid.mark_all_dirty()
 
     def update(self, dt):
         """Update day/night cycle time"""
         self.day_time += dt
         if self.day_time >= self.config.DAY_DURATION:
-            self.day_time = 0
+            # Carry the overshoot into the next phase so the clock does not drift
+            self.day_time -= self.config.DAY_DURATION
             self.is_day = not self.is_day
             return True  # Day/night transition occurred
         return False
@@ -23,130 +81,222 @@ class Simulation:
         # Get the appropriate ruleset based on time of day
         ruleset = self.config.rules["day"] if self.is_day else self.config.rules["night"]
 
-        # Calculate next state for each cell
-        for x in range(self.grid.width):
-            for y in range(self.grid.height):
-                self._calculate_next_state(x, y, ruleset)
-
-        # Apply the calculated next states
-        for x in range(self.grid.width):
-            for y in range(self.grid.height):
-                cell = self.grid.cells[x][y]
-                old_type = cell.cell_type
-                cell.update()
-
-                # Update vampire hunger if vampire survived
-                if old_type == Cell.VAMPIRE and cell.cell_type == Cell.VAMPIRE:
-                    self.vampire_hunger[x][y] += 1
-                elif cell.cell_type == Cell.VAMPIRE and old_type != Cell.VAMPIRE:
-                    # New vampire starts with no hunger
-                    self.vampire_hunger[x][y] = 0
-                elif cell.cell_type != Cell.VAMPIRE:
-                    # Reset hunger for non-vampires
-                    self.vampire_hunger[x][y] = 0
-
-    def _calculate_next_state(self, x, y, ruleset):
-        """Calculate the next state for a single cell"""
+        # A different ruleset (day/night flip or edited rules) can change any cell
+        rules_key = (self.is_day, repr(ruleset))
+        if rules_key != self._rules_key:
+            self._rules_key = rules_key
+            self.grid.mark_all_dirty()
+
+        # The state this step starts from, including any edits since the last one
+        if self.history is not None:
+            self._record_history()
+
+        self.generation += 1
+        if self.grid.UNBOUNDED:
+            self.active_fraction = self.grid.step(self.array_engine, self.is_day)
+            return
+
+        stepped_tiles = None
+        if self.engine == "bitplane":
+            # The generation stays packed in the engine; the grid arrays are unpacked when read
+            self._step_packed()
+        else:
+            # Whatever the engine evaluates, cell types only change near the dirty tiles
+            stepped_tiles = self.grid.dirty_tiles
+
+            # Engines write the back buffers and the grid swaps them in, so the previous
+            # generation stays readable (and is still in the back buffers afterwards)
+            if self.engine == "numpy":
+                self._step_arrays(self.grid.dirty_tiles)
+            elif self.engine == "parallel":
+                self._step_whole(self.parallel_engine)
+            else:
+                self._step_cells(self.grid.dirty_tiles)
+            self.grid.swap_buffers()
+            self._track_active_tiles(self.grid.back_buffers[0], ruleset)
+        self._stepped_tiles = stepped_tiles
+
+        if self.config.CYCLE_HISTORY:
+            if self.engine == "bitplane":
+                state_hash = self.bitplane_engine.state_hash()
+            else:
+                positions = None if stepped_tiles.all() else self.grid.cells_near(stepped_tiles)
+                state_hash = self.state_hasher.update(self.grid.cell_types, self.grid.ages, self.grid.hunger,
+                                                      positions)
+            self.cycles.record(self.generation, state_hash, rules_key)
+        else:
+            self.state_hasher.reset()  # Hash every cell again should detection be switched back on
+
+    def fast_forward(self, max_generations):
+        """Skip whole periods of a detected cycle, returning the number of generations skipped
+
+        The cycle only holds while the current ruleset applies, so max_generations
+        must not reach past the next day/night flip; the caller advances the clock.
+        """
+        period = self.cycles.period
+        if period is None or self.grid.UNBOUNDED:
+            return 0
+        skipped = max_generations // period * period
+        if not skipped:
+            return 0
+
+        # Cells that kept their type for a whole period just grow older; the rest repeat exactly
+        grid = self.grid
+        steady = (grid.cell_types != Cell.EMPTY) & (grid.ages >= period)
+        grid.ages[steady] = np.minimum(grid.ages[steady].astype(np.int64) + skipped, grid.AGE_MAX)
+        grid.population.invalidate()
+        grid.mark_all_dirty()
+
+        self.generation += skipped
+        self.cycles.reset()
+        return skipped
+
+    def _record_history(self):
+        grid = self.grid
+        base = positions = None
+        if self._stepped_tiles is not None:
+            # The back buffers still hold the generation recorded before the last step, and
+            # cells away from its dirty tiles and from later edits only aged since
+            base = grid.back_buffers
+            tiles = self._stepped_tiles | grid.dirty_tiles
+            if not tiles.all():
+                positions = grid.cells_near(tiles)
+                # Gathering most of the grid costs more than comparing all of it
+                if positions.size > grid.width * grid.height // 4:
+                    positions = None
+        self.history.record(self.generation, grid.cell_types, grid.ages, grid.hunger,
+                            (self.is_day, self.day_time), base, positions)
+
+    def seek(self, generation):
+        """Restore a generation from the rewind history, returning whether it was still available"""
+        if self.history is None:
+            return False
+        # Keep the current generation so it can be sought back to
+        if self.history.last is None or self.history.last < self.generation:
+            self._record_history()
+        state = self.history.seek(generation)
+        if state is None or state[0].shape != self.grid.cell_types.shape:
+            return False
+
+        grid = self.grid
+        cell_types, ages, hunger, (self.is_day, self.day_time) = state
+        np.copyto(grid.cell_types, cell_types)
+        np.copyto(grid.ages, ages)
+        np.copyto(grid.hunger, hunger)
+        grid.population.invalidate()
+        grid.mark_all_dirty()
+
+        self.generation = generation
+        self.state_hasher.reset()
+        self.cycles.reset()
+        return True
+
+    def _step_cells(self, active_tiles):
+        """Perform one step with the per-cell engine, evaluating only the active region"""
+        # Every cell is rewritten, so recount once afterwards instead of per edit
+        self.grid.population.invalidate()
+
+        # Calculate next state for each cell of the active tiles and their one-cell halo
+        xs, ys = self.grid.tile_windows(active_tiles, 1)
+        active = np.zeros((self.grid.width, self.grid.height), dtype=bool)
+        active[xs[:, :, None], ys[:, None, :]] = True
+        self.active_fraction = np.count_nonzero(active) / active.size
+
+        # Inactive cells keep their type; active ones get theirs from the rule table
+        grid = self.grid
+        next_types = grid.back_buffers[0]
+        np.copyto(next_types, grid.cell_types)
+        fed_hunger = grid.hunger.copy()
+        table = self.rule_tables.get(self.is_day)
+        for x, y in zip(*np.nonzero(active)):
+            self._calculate_next_state(x, y, table, next_types, fed_hunger)
+
+        # Age every cell into the new generation in one pass
+        self.array_engine.apply(grid.cell_types, grid.ages, fed_hunger, next_types, grid.back_buffers)
+
+    def _step_arrays(self, active_tiles):
+        """Perform one step with the vectorized engine directly on the grid arrays"""
+        grid = self.grid
+
+        # Busy grids are cheaper to step whole than to gather tile windows for
+        windows = None
+        if np.count_nonzero(active_tiles) <= self.config.ACTIVE_TILE_LIMIT * active_tiles.size:
+            windows = grid.tile_windows(active_tiles, self.array_engine.WINDOW_MARGIN)
+            interior = np.zeros((grid.width, grid.height), dtype=bool)
+            interior[windows[0][:, 1:-1, None], windows[1][:, None, 1:-1]] = True
+            self.active_fraction = np.count_nonzero(interior) / interior.size
+            before = PopulationCounter.tally(grid.cell_types[interior], grid.ages[interior])
+        else:
+            self.active_fraction = 1.0
+
+        cell_types, ages, _ = self.array_engine.step(
+            grid.cell_types, grid.ages, grid.hunger, self.is_day, windows, grid.back_buffers)
+
+        # Cells outside the windows only aged, so only the windows need recounting
+        if windows is None:
+            grid.population.invalidate()
+        else:
+            grid.population.advance(before, PopulationCounter.tally(cell_types[interior], ages[interior]))
+
+    def _step_whole(self, engine):
+        """Perform one step with the parallel engine; the whole torus is always evaluated"""
+        grid = self.grid
+        self.active_fraction = 1.0
+        engine.attach(grid)  # No-op unless the engine was closed since
+        engine.step(grid.cell_types, grid.ages, grid.hunger, self.is_day, out=grid.back_buffers)
+        grid.population.invalidate()
+
+    def _step_packed(self):
+        """Perform one step with the bit-plane engine on its packed state; the whole torus is always evaluated"""
+        self.active_fraction = 1.0
+        self.bitplane_engine.step_grid(self.grid, self.is_day)
+        self.grid.population.invalidate()
+
+    def close(self):
+        """Release engine resources such as worker processes"""
+        if self.parallel_engine is not None:
+            self.parallel_engine.close()
+
+    def _track_active_tiles(self, previous_types, ruleset):
+        """Flag the tiles that can change in the next step"""
+        cell_types = self.grid.cell_types
+
+        # Cells that just changed, plus state that still evolves without neighbour changes:
+        # vampire hunger and sunlight resistance, and humans not yet past the wisdom age
+        pending = previous_types != cell_types
+        pending |= cell_types == Cell.VAMPIRE
+        pending |= (cell_types == Cell.HUMAN) & (self.grid.ages <= ruleset["human"]["wisdom_age"] + 1)
+        self.grid.dirty_tiles = self.grid.tiles_containing(pending)
+
+    def _calculate_next_state(self, x, y, table, next_types, fed_hunger):
+        """Calculate the next state for a single cell from the compiled rule table into next_types"""
         cell = self.grid.cells[x][y]
 
         # Count neighbors
         human_neighbors = self.grid.count_neighbors(x, y, Cell.HUMAN)
         vampire_neighbors = self.grid.count_neighbors(x, y, Cell.VAMPIRE)
-        total_neighbors = human_neighbors + vampire_neighbors
-
-        # Empty cell rules
-        if cell.is_empty():
-            # Human reproduction - check for fear of vampires
-            if human_neighbors == ruleset["human"]["reproduce"]:
-                # Humans won't reproduce near vampires if they're afraid
-                if vampire_neighbors <= ruleset["human"]["fear_threshold"]:
-                    cell.set_next_state(Cell.HUMAN)
-            # Vampire reproduction
-            elif vampire_neighbors == ruleset["vampire"]["reproduce"]:
-                cell.set_next_state(Cell.VAMPIRE)
-
-        # Human cell rules
-        elif cell.is_human():
-            # Check for human defenses (safety in numbers)
-            is_defended = human_neighbors >= ruleset["human"]["defense_threshold"]
-
-            # Conversion to vampire - affected by age and group defense
-            vulnerability = ruleset["human"]["base_vulnerability"]
-
-            # Older humans are wiser and more resistant
-            if cell.age > ruleset["human"]["wisdom_age"]:
-                vulnerability *= ruleset["human"]["wisdom_resistance"]
-
-            # Group defense reduces vulnerability
-            if is_defended:
-                vulnerability *= ruleset["human"]["group_resistance"]
-
-            # Calculate chance of conversion based on vampire neighbors
-            conversion_chance = vulnerability * vampire_neighbors
-
-            if conversion_chance >= ruleset["human"]["convert_threshold"]:
-                cell.set_next_state(Cell.VAMPIRE)
-            # Check for survival based on human population dynamics
-            elif (human_neighbors < ruleset["human"]["survive_min"] or
-                  human_neighbors > ruleset["human"]["survive_max"]):
-                cell.set_next_state(Cell.EMPTY)
-
-        # Vampire cell rules
-        elif cell.is_vampire():
-            # Track vampire hunger level
-            hunger = self.vampire_hunger[x][y]
-
-            # Vampires need to feed on humans or die
-            has_fed = False
-            if human_neighbors > 0:
-                # Vampire has fed and resets hunger
-                has_fed = True
-                self.vampire_hunger[x][y] = 0
-
-                # Attempt to feed on a random adjacent human
-                if ruleset["vampire"]["feeding_converts"]:
-                    # This is handled by human conversion logic already
-                    pass
-
-            # Check for death in sunlight - older vampires are more resistant
-            if self.is_day and ruleset["vampire"]["die_in_sunlight"]:
-                sunlight_resistance = min(cell.age / ruleset["vampire"]["age_resistance"], 1)
-                sunlight_death_chance = ruleset["vampire"]["sunlight_mortality"] * (1 - sunlight_resistance)
-
-                if not has_fed and sunlight_death_chance > 0.5:  # Simplified check
-                    cell.set_next_state(Cell.EMPTY)
-                    return
-
-            # Check for starvation
-            if hunger >= ruleset["vampire"]["hunger_threshold"] and not has_fed:
-                cell.set_next_state(Cell.EMPTY)
-                return
-
-            # Check for survival based on vampire social dynamics
-            if (vampire_neighbors < ruleset["vampire"]["survive_min"] or
-                    vampire_neighbors > ruleset["vampire"]["survive_max"]):
-                cell.set_next_state(Cell.EMPTY)
+
+        # Starvation is judged on the hunger from before this step's feeding
+        hunger = fed_hunger[x, y]
+        if cell.is_vampire() and human_neighbors > 0:
+            # Vampire has fed and resets hunger
+            fed_hunger[x, y] = 0
+
+        next_types[x, y] = table.next_state(cell.cell_type, human_neighbors, vampire_neighbors, cell.age, hunger)
 
     def get_statistics(self):
         """Get current statistics about the simulation"""
-        human_count = 0
-        vampire_count = 0
-        empty_count = 0
-
-        for x in range(self.grid.width):
-            for y in range(self.grid.height):
-                cell_type = self.grid.cells[x][y].cell_type
-                if cell_type == Cell.HUMAN:
-                    human_count += 1
-                elif cell_type == Cell.VAMPIRE:
-                    vampire_count += 1
-                else:
-                    empty_count += 1
+        counts = self.grid.count_types()
+        human_count = int(counts[Cell.HUMAN])
+        vampire_count = int(counts[Cell.VAMPIRE])
+        empty_count = int(counts.sum()) - human_count - vampire_count
 
         return {
             "human_count": human_count,
             "vampire_count": vampire_count,
             "empty_count": empty_count,
             "is_day": self.is_day,
-            "day_progress": self.day_time / self.config.DAY_DURATION
-        }
\ No newline at end of file
+            "day_progress": self.day_time / self.config.DAY_DURATION,
+            "active_fraction": self.active_fraction,
+            "cycle_period": self.cycle_period
+        }
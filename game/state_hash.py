@@ -0,0 +1,150 @@
+from collections import deque
+import numpy as np
+from game.entities import Cell
+
+
+# splitmix64 constants
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+MIX_A = np.uint64(0xBF58476D1CE4E5B9)
+MIX_B = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(values):
+    """splitmix64 finalizer over a uint64 array"""
+    values = values ^ (values >> np.uint64(30))
+    values = values * MIX_A
+    values = values ^ (values >> np.uint64(27))
+    values = values * MIX_B
+    return values ^ (values >> np.uint64(31))
+
+
+class StateHasher:
+    """Incremental Zobrist-style hash of the grid state that decides future generations
+
+    Each cell is encoded as its type plus its age and hunger capped where the
+    rules stop telling them apart, so two states with equal hashes evolve the
+    same way under the same ruleset. Per-cell keys are derived by mixing the
+    cell index and code, so no key tables are stored, and only cells whose code
+    changed are re-hashed. Given the cells a step may have changed, an update
+    only encodes those plus the cells whose code can still grow on its own
+    (young cells and vampires); every other code is saturated and stays put.
+    """
+
+    def __init__(self, rule_tables, seed=0):
+        self.rule_tables = rule_tables
+        self._salt = _mix(np.array([seed], dtype=np.uint64) + GOLDEN)[0]
+        self._codes = None
+        self._caps = None
+        self._evolving = None  # Flat indices of the cells whose code may change without a type change
+        self.value = 0
+
+    def _current_caps(self):
+        """Largest age and hunger values any threshold of either ruleset distinguishes"""
+        tables = [self.rule_tables.get(is_day) for is_day in (True, False)]
+        age_cap = max(table.age_limit for table in tables)
+        hunger_cap = max(max(int(np.ceil(table.hunger_threshold)), 0) for table in tables)
+        return age_cap, hunger_cap
+
+    def _encode(self, cell_types, ages, hunger, caps):
+        age_cap, hunger_cap = caps
+        codes = cell_types.astype(np.uint32)
+        codes *= (age_cap + 1) * (hunger_cap + 1)
+        codes += np.minimum(ages, age_cap) * np.uint32(hunger_cap + 1)
+        codes += np.minimum(hunger, hunger_cap)
+        return codes.ravel()
+
+    @staticmethod
+    def _evolving_cells(cell_types, ages, caps):
+        """Which of the given cells can change code while keeping their type"""
+        return (cell_types == Cell.VAMPIRE) | ((cell_types != Cell.EMPTY) & (ages < caps[0]))
+
+    def _combine(self, positions, codes):
+        """XOR of the keys of the given cells; empty cells with no age or hunger (code 0) add nothing"""
+        occupied = codes != 0
+        positions, codes = positions[occupied], codes[occupied]
+        if not positions.size:
+            return 0
+        keys = _mix(_mix(positions.astype(np.uint64) ^ self._salt) ^ (codes.astype(np.uint64) * GOLDEN))
+        return int(np.bitwise_xor.reduce(keys))
+
+    def reset(self):
+        """Forget the previous state so the next update hashes every cell"""
+        self._codes = None
+
+    def update(self, cell_types, ages, hunger, positions=None):
+        """Bring the hash up to date with the grid arrays and return it
+
+        positions optionally gives the flat indices of every cell whose type may
+        have changed since the last update (see Grid.cells_near); without it
+        every cell is encoded.
+        """
+        caps = self._current_caps()
+        full = (positions is None or self._codes is None or caps != self._caps or
+                self._codes.size != cell_types.size)
+        if not full:
+            selected = np.zeros(cell_types.size, dtype=bool)
+            selected[positions] = True
+            selected[self._evolving] = True
+            positions = np.flatnonzero(selected)
+            # Gathering scattered cells only pays off while they are a small share of the grid
+            full = positions.size > cell_types.size // 4
+
+        if full:
+            codes = self._encode(cell_types, ages, hunger, caps)
+            if self._codes is None or caps != self._caps or codes.shape != self._codes.shape:
+                self.value = self._combine(np.arange(codes.size), codes)
+            else:
+                changed = np.flatnonzero(codes != self._codes)
+                self.value ^= self._combine(changed, self._codes[changed]) ^ self._combine(changed, codes[changed])
+            self._codes = codes
+            self._caps = caps
+            self._evolving = np.flatnonzero(self._evolving_cells(cell_types.ravel(), ages.ravel(), caps))
+            return self.value
+
+        types, ages, hunger = (array.ravel()[positions] for array in (cell_types, ages, hunger))
+        codes = self._encode(types, ages, hunger, caps)
+        previous = self._codes[positions]
+        changed = codes != previous
+        self.value ^= (self._combine(positions[changed], previous[changed]) ^
+                       self._combine(positions[changed], codes[changed]))
+        self._codes[positions] = codes
+        self._evolving = positions[self._evolving_cells(types, ages, caps)]
+        return self.value
+
+
+class CycleDetector:
+    """Bounded history of state hashes that spots still lifes (period 1) and period-N cycles
+
+    History restarts whenever the phase (time of day and ruleset) changes,
+    since a repeat only predicts the future while the same rules apply.
+    """
+
+    def __init__(self, history):
+        self.history = history
+        self._entries = deque()
+        self._seen = {}
+        self._phase = None
+        self.period = None
+
+    def reset(self):
+        self._entries.clear()
+        self._seen.clear()
+        self._phase = None
+        self.period = None
+
+    def record(self, generation, state_hash, phase):
+        """Add a generation's hash, returning the cycle period if the state was seen before"""
+        if phase != self._phase:
+            self.reset()
+            self._phase = phase
+
+        previous = self._seen.get(state_hash)
+        self.period = generation - previous if previous is not None else None
+
+        self._entries.append((generation, state_hash))
+        self._seen[state_hash] = generation
+        while len(self._entries) > self.history:
+            old_generation, old_hash = self._entries.popleft()
+            if self._seen.get(old_hash) == old_generation:
+                del self._seen[old_hash]
+        return self.period
@@ -0,0 +1,263 @@
+"""
+Parallel parameter sweep over Config.rules.
+
+Each --vary option names a rule as phase.species.key (or species.key for both
+phases) and gives its values either as a comma list or as an inclusive
+start:stop:step range. Every combination is run for several seeds in a process
+pool. Finished runs are appended to runs.jsonl as they complete, so an
+interrupted sweep picks up where it stopped when started again with the same
+arguments. summary.csv aggregates survival times and final populations per
+combination.
+
+Example:
+    python -m game.sweep --vary day.human.convert_threshold=0.6:1.2:0.2 \\
+        --vary vampire.hunger_threshold=3,5,7 --seeds 5 --steps 2000 --workers 4
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import time
+
+from utils.config import Config
+from game.patterns import SCENARIOS
+from game.run import build_simulation, run_steps
+
+
+PHASES = ("day", "night")
+
+
+def parse_value(text):
+    """Parse a rule value from the command line as bool, int or float"""
+    lowered = text.strip().lower()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_values(text):
+    """Parse a comma list or an inclusive start:stop:step range"""
+    if ":" not in text:
+        return [parse_value(part) for part in text.split(",")]
+
+    start, stop, step = (parse_value(part) for part in text.split(":"))
+    if step <= 0:
+        raise ValueError(f"Range step must be positive: {text}")
+    values = []
+    index = 0
+    # Build values from the index to avoid accumulating floating point error
+    while start + index * step <= stop + abs(step) * 1e-9:
+        value = start + index * step
+        values.append(round(value, 10) if isinstance(value, float) else value)
+        index += 1
+    return values
+
+
+def parse_vary(option, rules):
+    """Parse one --vary option into (rule paths, values)"""
+    name, _, values = option.partition("=")
+    parts = name.strip().split(".")
+    if len(parts) == 2:
+        paths = [(phase, parts[0], parts[1]) for phase in PHASES]
+    elif len(parts) == 3 and parts[0] in PHASES:
+        paths = [tuple(parts)]
+    else:
+        raise ValueError(f"Expected phase.species.key or species.key, got: {name}")
+
+    for phase, species, key in paths:
+        if key not in rules[phase].get(species, {}):
+            raise ValueError(f"Unknown rule: {phase}.{species}.{key}")
+    return paths, parse_values(values)
+
+
+def expand_grid(variations):
+    """Expand (name, paths, values) variations into a list of parameter dicts"""
+    names = [name for name, _, _ in variations]
+    combinations = itertools.product(*(values for _, _, values in variations))
+    return [dict(zip(names, combination)) for combination in combinations]
+
+
+def apply_parameters(config, variations, params):
+    """Write a parameter combination into config.rules"""
+    for name, paths, _ in variations:
+        for phase, species, key in paths:
+            config.rules[phase][species][key] = params[name]
+
+
+def task_key(params, seed):
+    return json.dumps({"params": params, "seed": seed}, sort_keys=True)
+
+
+def run_task(task):
+    """Run one (parameters, seed) combination and summarize how each species fared"""
+    variations, params, seed, settings = task
+    config = Config()
+    config.GRID_WIDTH = settings["width"]
+    config.GRID_HEIGHT = settings["height"]
+    apply_parameters(config, variations, params)
+
+    start = time.perf_counter()
+    simulation = build_simulation(config, seed, settings["scenario"], settings["engine"])
+    human_extinct = None
+    vampire_extinct = None
+    generation = 0
+    # Population counts repeat with a cycle, so skipping through cycles cannot hide an extinction
+    for generation in run_steps(simulation, settings["steps"], settings["day_length"], fast_forward=True):
+        stats = simulation.get_statistics()
+        if human_extinct is None and stats["human_count"] == 0:
+            human_extinct = generation
+        if vampire_extinct is None and stats["vampire_count"] == 0:
+            vampire_extinct = generation
+        # Without humans or vampires nothing can ever change again
+        if human_extinct is not None and vampire_extinct is not None:
+            break
+
+    stats = simulation.get_statistics()
+    return {
+        "key": task_key(params, seed),
+        "params": params,
+        "seed": seed,
+        "generations": generation,
+        "human_extinct": human_extinct,
+        "vampire_extinct": vampire_extinct,
+        "final_humans": stats["human_count"],
+        "final_vampires": stats["vampire_count"],
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+def load_finished(path):
+    """Load completed runs from a results file, ignoring a truncated last line"""
+    finished = {}
+    if not os.path.exists(path):
+        return finished
+    with open(path) as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            finished[result["key"]] = result
+    return finished
+
+
+def summarize(results, parameter_sets, steps):
+    """Aggregate run results into one row per parameter combination"""
+    rows = []
+    for params in parameter_sets:
+        runs = [result for result in results if result["params"] == params]
+        if not runs:
+            continue
+
+        # A species that never died out survived for the whole run
+        human_survival = [run["human_extinct"] or steps for run in runs]
+        vampire_survival = [run["vampire_extinct"] or steps for run in runs]
+        row = dict(params)
+        row.update({
+            "runs": len(runs),
+            "mean_human_survival": sum(human_survival) / len(runs),
+            "min_human_survival": min(human_survival),
+            "mean_vampire_survival": sum(vampire_survival) / len(runs),
+            "min_vampire_survival": min(vampire_survival),
+            "human_survival_rate": sum(run["human_extinct"] is None for run in runs) / len(runs),
+            "vampire_survival_rate": sum(run["vampire_extinct"] is None for run in runs) / len(runs),
+            "mean_final_humans": sum(run["final_humans"] for run in runs) / len(runs),
+            "mean_final_vampires": sum(run["final_vampires"] for run in runs) / len(runs)
+        })
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    config = Config()
+    parser = argparse.ArgumentParser(description="Sweep Config.rules values over several seeds")
+    parser.add_argument("--vary", action="append", required=True, metavar="RULE=VALUES",
+                        help="rule as phase.species.key or species.key, values as a,b,c or start:stop:step")
+    parser.add_argument("--seeds", type=int, default=3, help="seeds per parameter combination")
+    parser.add_argument("--base-seed", type=int, default=0, help="first seed")
+    parser.add_argument("--steps", type=int, default=1000, help="generations per run")
+    parser.add_argument("--width", type=int, default=config.GRID_WIDTH)
+    parser.add_argument("--height", type=int, default=config.GRID_HEIGHT)
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default=None,
+                        help="predefined scenario (default: random population)")
+    parser.add_argument("--day-length", type=int,
+                        default=config.DAY_DURATION * config.DEFAULT_SIMULATION_SPEED,
+                        help="generations per day or night phase")
+    parser.add_argument("--engine", choices=["numpy", "python", "bitplane"], default="numpy")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="worker processes")
+    parser.add_argument("--output-dir", default="sweeps/latest", help="directory for results and summary")
+    args = parser.parse_args(argv)
+
+    variations = []
+    for option in args.vary:
+        paths, values = parse_vary(option, config.rules)
+        variations.append((option.partition("=")[0].strip(), paths, values))
+    parameter_sets = expand_grid(variations)
+    seeds = list(range(args.base_seed, args.base_seed + args.seeds))
+
+    settings = {
+        "steps": args.steps,
+        "width": args.width,
+        "height": args.height,
+        "scenario": args.scenario,
+        "day_length": args.day_length,
+        "engine": args.engine
+    }
+
+    # Refuse to mix results from a sweep with different run settings
+    os.makedirs(args.output_dir, exist_ok=True)
+    settings_path = os.path.join(args.output_dir, "sweep.json")
+    if os.path.exists(settings_path):
+        with open(settings_path) as f:
+            if json.load(f) != settings:
+                raise SystemExit(f"{args.output_dir} holds a sweep with different settings; use another --output-dir")
+    else:
+        with open(settings_path, "w") as f:
+            json.dump(settings, f, indent=2)
+
+    results_path = os.path.join(args.output_dir, "runs.jsonl")
+    finished = load_finished(results_path)
+    tasks = [(variations, params, seed, settings)
+             for params in parameter_sets for seed in seeds
+             if task_key(params, seed) not in finished]
+    total = len(parameter_sets) * len(seeds)
+    print(f"{len(parameter_sets)} combinations x {len(seeds)} seeds = {total} runs, "
+          f"{total - len(tasks)} already done, {args.workers} workers")
+
+    start = time.perf_counter()
+    pool = multiprocessing.Pool(args.workers) if args.workers > 1 and len(tasks) > 1 else None
+    results = pool.imap_unordered(run_task, tasks) if pool else map(run_task, tasks)
+    try:
+        with open(results_path, "a") as f:
+            for done, result in enumerate(results, 1):
+                f.write(json.dumps(result) + "\n")
+                f.flush()
+                finished[result["key"]] = result
+
+                elapsed = time.perf_counter() - start
+                remaining = elapsed / done * (len(tasks) - done)
+                print(f"[{total - len(tasks) + done}/{total}] {result['params']} seed {result['seed']}: "
+                      f"humans {result['human_extinct'] or 'survived'}, "
+                      f"vampires {result['vampire_extinct'] or 'survived'} "
+                      f"(eta {remaining:.0f}s)")
+    finally:
+        if pool:
+            pool.terminate()
+
+    rows = summarize(list(finished.values()), parameter_sets, args.steps)
+    summary_path = os.path.join(args.output_dir, "summary.csv")
+    with open(summary_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Summary written to {summary_path}")
+
+
+if __name__ == "__main__":
+    main()
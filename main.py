@@ -4,6 +4,7 @@ from utils.config import Config
 from ui.main_menu import MainMenu
 from ui.game_screen import GameScreen
 from ui.settings_menu import SettingsMenu
+from ui.text_cache import TextCache
 from utils.audio import AudioManager
 
 
@@ -21,6 +22,9 @@ class Game:
         # Initialize audio manager
         self.audio_manager = AudioManager(self.config)
 
+        # Rendered text shared by every screen
+        self.text_cache = TextCache(self.config.TEXT_CACHE_SIZE)
+
         # Game states
         self.MAIN_MENU = 0
         self.GAME_SCREEN = 1
@@ -38,7 +42,11 @@ class Game:
 
     def run(self):
         running = True
+        drawn_state = None
         while running:
+            # Real time since the previous frame, so the simulation keeps pace when frames run late
+            dt = self.clock.tick(self.config.FPS) / 1000
+
             # Handle events
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -56,7 +64,7 @@ class Game:
             if self.current_state == self.MAIN_MENU:
                 self.main_menu.update()
             elif self.current_state == self.GAME_SCREEN:
-                self.game_screen.update()
+                self.game_screen.update(dt)
             elif self.current_state == self.SETTINGS:
                 self.settings_menu.update()
 
@@ -64,18 +72,25 @@ class Game:
             self._handle_music_transitions()
 
             # Render current screen
-            self.screen.fill(self.config.BG_COLOR)
+            if self.current_state == self.GAME_SCREEN:
+                # The game screen redraws and pushes only the regions that changed; idle frames push nothing
+                if drawn_state != self.GAME_SCREEN:
+                    self.game_screen.invalidate()
+                dirty_rects = self.game_screen.draw(self.screen)
+                if dirty_rects:
+                    pygame.display.update(dirty_rects)
+            else:
+                self.screen.fill(self.config.BG_COLOR)
 
-            if self.current_state == self.MAIN_MENU:
-                self.main_menu.draw(self.screen)
-            elif self.current_state == self.GAME_SCREEN:
-                self.game_screen.draw(self.screen)
-            elif self.current_state == self.SETTINGS:
-                self.settings_menu.draw(self.screen)
+                if self.current_state == self.MAIN_MENU:
+                    self.main_menu.draw(self.screen)
+                elif self.current_state == self.SETTINGS:
+                    self.settings_menu.draw(self.screen)
 
-            pygame.display.flip()
-            self.clock.tick(self.config.FPS)
+                pygame.display.flip()
+            drawn_state = self.current_state
 
+        self.game_screen.close()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,85 @@
+import random
+
+import numpy as np
+import pytest
+
+from utils.config import Config
+from game.entities import Cell
+from game.grid import Grid
+from game.simulation import Simulation
+from game.run import build_simulation, run_steps
+
+
+def make_config():
+    config = Config()
+    config.GRID_WIDTH = 36
+    config.GRID_HEIGHT = 28
+    config.DAY_DURATION = 6
+    config.HISTORY_MEMORY_LIMIT = 0
+    config.SIMULATION_WORKERS = 2
+    return config
+
+
+def make_simulation(engine, seed):
+    config = make_config()
+    grid = Grid(config)
+    grid.random_populate(0.2, 0.1, 0.05, 0.03, seed=seed)
+    return Simulation(grid, config, engine=engine)
+
+
+def edit(grid, generation):
+    """The same edits for every engine, so the runs stay comparable"""
+    rng = random.Random(generation)
+    grid.set_cell(rng.randrange(grid.width), rng.randrange(grid.height), rng.choice((Cell.HUMAN, Cell.VAMPIRE)))
+    grid.add_pattern([[Cell.HUMAN, Cell.HUMAN, Cell.EMPTY], [Cell.VAMPIRE, Cell.FOREST, Cell.HUMAN]],
+                     rng.randrange(grid.width), rng.randrange(grid.height))
+    grid.cells[rng.randrange(grid.width)][rng.randrange(grid.height)].age += 5
+
+
+def assert_same_state(simulation, reference, label):
+    for name in ("cell_types", "ages", "hunger"):
+        np.testing.assert_array_equal(getattr(simulation.grid, name), getattr(reference.grid, name),
+                                      err_msg=f"{name} differ {label}")
+    assert simulation.is_day == reference.is_day
+
+
+@pytest.mark.parametrize("engine", ["numpy", "parallel", "bitplane"])
+@pytest.mark.parametrize("seed", [1, 7])
+def test_engine_matches_python_reference(engine, seed):
+    reference = make_simulation("python", seed)
+    simulation = make_simulation(engine, seed)
+    try:
+        flipped = False
+        for generation in range(30):
+            if generation % 8 == 3:
+                edit(reference.grid, generation)
+                edit(simulation.grid, generation)
+            reference.step()
+            simulation.step()
+            flipped |= reference.update(1)
+            simulation.update(1)
+            assert_same_state(simulation, reference, f"after generation {generation + 1}")
+        assert flipped
+        assert simulation.grid.get_population_stats() == reference.grid.get_population_stats()
+    finally:
+        reference.close()
+        simulation.close()
+
+
+@pytest.mark.parametrize("seed, scenario", [(0, None), (4, None), (1, "village_raid")])
+def test_fast_forward_matches_stepping(seed, scenario):
+    def make():
+        config = Config()
+        config.GRID_WIDTH = 40
+        config.GRID_HEIGHT = 30
+        return build_simulation(config, seed, scenario, "numpy")
+
+    stepped, skipped = make(), make()
+    generations = list(run_steps(stepped, 300, 60))
+    fast_generations = list(run_steps(skipped, 300, 60, fast_forward=True))
+
+    assert generations[-1] == fast_generations[-1] == 300
+    assert len(fast_generations) < len(generations)
+    assert_same_state(skipped, stepped, "after fast forwarding")
+    assert skipped.day_time == stepped.day_time
+    assert skipped.grid.get_population_stats() == stepped.grid.get_population_stats()
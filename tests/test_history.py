@@ -0,0 +1,103 @@
+import numpy as np
+
+from utils.config import Config
+from game.entities import Cell
+from game.grid import Grid
+from game.simulation import Simulation
+from game.patterns import apply_scenario
+from game.replay import ReplayLog, Replayer
+
+
+def make_config():
+    config = Config()
+    config.GRID_WIDTH = 48
+    config.GRID_HEIGHT = 36
+    config.DAY_DURATION = 5
+    config.HISTORY_KEYFRAME_INTERVAL = 8
+    config.REPLAY_SYNC_INTERVAL = 10
+    return config
+
+
+def snapshot(simulation):
+    grid = simulation.grid
+    return (grid.cell_types.copy(), grid.ages.copy(), grid.hunger.copy(), simulation.is_day, simulation.day_time)
+
+
+def assert_state(simulation, state):
+    cell_types, ages, hunger, is_day, day_time = state
+    np.testing.assert_array_equal(simulation.grid.cell_types, cell_types)
+    np.testing.assert_array_equal(simulation.grid.ages, ages)
+    np.testing.assert_array_equal(simulation.grid.hunger, hunger)
+    assert (simulation.is_day, simulation.day_time) == (is_day, day_time)
+
+
+def test_seek_and_step_again():
+    # A sparse world, so generations are recorded from the tiles each step changed
+    config = make_config()
+    config.GRID_WIDTH = config.GRID_HEIGHT = 128
+    grid = Grid(config)
+    apply_scenario(grid, "village_raid")
+    simulation = Simulation(grid, config, engine="numpy")
+
+    states = {}
+    for generation in range(30):
+        if generation == 13:
+            grid.set_cell(70, 100, Cell.FOREST)
+        states[simulation.generation] = snapshot(simulation)
+        simulation.step()
+        simulation.update(1)
+    states[simulation.generation] = snapshot(simulation)
+
+    for generation in (29, 14, 3):
+        assert simulation.seek(generation)
+        assert simulation.generation == generation
+        assert_state(simulation, states[generation])
+
+    # Stepping on from a rewound generation replays the same generations
+    for _ in range(5):
+        simulation.step()
+        simulation.update(1)
+        assert_state(simulation, states[simulation.generation])
+
+    # ...and discards the history after it
+    assert not simulation.seek(20)
+    assert simulation.seek(6)
+    assert_state(simulation, states[6])
+
+
+def test_replay_round_trip(tmp_path):
+    config = make_config()
+    speed = 4.0
+    log = ReplayLog(str(tmp_path / "session.vcr"), config)
+    grid = Grid(config)
+    simulation = Simulation(grid, config, engine="numpy")
+    log.attach(grid, simulation)
+
+    def advance():
+        # As GameScreen._advance does
+        log.sync(speed)
+        simulation.step()
+        simulation.update(1.0 / speed)
+        log.stepped()
+
+    grid.random_populate(seed=9)
+    for generation in range(40):
+        if generation == 8:
+            grid.set_cell(10, 12, Cell.HUMAN)
+            grid.add_pattern([[Cell.VAMPIRE, Cell.HUMAN], [Cell.FOREST, Cell.BUNKER]], 30, 20)
+        if generation == 20:
+            speed = 2.0
+            config.DAY_DURATION = 3
+        if generation == 25:
+            log.seek(simulation.generation - 4)
+            assert simulation.seek(simulation.generation - 4)
+        advance()
+    final = snapshot(simulation)
+    final_generation = simulation.generation
+    log.close()
+
+    replayer = Replayer(log.path, Config())
+    generations = list(replayer.run())
+
+    assert generations[-1] == replayer.simulation.generation == final_generation
+    assert_state(replayer.simulation, final)
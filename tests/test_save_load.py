@@ -0,0 +1,69 @@
+import random
+
+import numpy as np
+
+from utils.config import Config
+from utils.save_load import SaveLoadManager
+from game.grid import Grid
+from game.chunked_grid import ChunkedGrid
+from game.simulation import Simulation
+
+
+def make_config(tmp_path):
+    config = Config()
+    config.GRID_WIDTH = 40
+    config.GRID_HEIGHT = 30
+    config.HISTORY_MEMORY_LIMIT = 0
+    config.SAVE_FOLDER = str(tmp_path)
+    return config
+
+
+def step_world(grid, config, steps=5):
+    random.seed(3)
+    grid.random_populate()
+    simulation = Simulation(grid, config, engine="numpy")
+    for _ in range(steps):
+        simulation.step()
+    simulation.is_day = False
+    simulation.day_time = 7
+    return simulation
+
+
+def test_grid_round_trip(tmp_path):
+    config = make_config(tmp_path)
+    grid = Grid(config)
+    simulation = step_world(grid, config)
+
+    manager = SaveLoadManager(config)
+    assert manager.save_game(grid, simulation, filename="vampire_city_save_grid.json")
+    loaded_grid, loaded_simulation = manager.load_game("vampire_city_save_grid.json")
+
+    assert isinstance(loaded_grid, Grid)
+    np.testing.assert_array_equal(loaded_grid.cell_types, grid.cell_types)
+    np.testing.assert_array_equal(loaded_grid.hunger, grid.hunger)
+    assert loaded_simulation.is_day is False
+    assert loaded_simulation.day_time == 7
+    assert loaded_grid.count_types().tolist() == grid.count_types().tolist()
+
+
+def test_unbounded_round_trip(tmp_path):
+    config = make_config(tmp_path)
+    grid = ChunkedGrid(config)
+    simulation = step_world(grid, config)
+
+    manager = SaveLoadManager(config)
+    assert manager.save_game(grid, simulation, filename="vampire_city_save_unbounded.json")
+    loaded = manager.load_game("vampire_city_save_unbounded.json")
+    assert loaded is not None
+    loaded_grid, loaded_simulation = loaded
+
+    assert isinstance(loaded_grid, ChunkedGrid)
+    assert loaded_grid.get_serialized_state() == grid.get_serialized_state()
+    assert loaded_grid.get_population_stats() == grid.get_population_stats()
+    assert loaded_simulation.is_day is False
+    assert loaded_simulation.day_time == 7
+
+    # The loaded world keeps stepping like the original
+    simulation.step()
+    loaded_simulation.step()
+    assert loaded_grid.get_serialized_state() == grid.get_serialized_state()
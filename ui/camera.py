@@ -0,0 +1,97 @@
+import pygame
+
+
+class Camera:
+    """Zoom and pan of the grid view: which cells show in the viewport, and how large
+
+    The position (x, y) is the grid pixel, at the current cell size, shown at
+    the viewport's top-left corner. Along an axis where the whole grid fits it
+    is negative, so the grid sits centred in the viewport.
+    """
+
+    def __init__(self, viewport, grid_width, grid_height, cell_size, zoom_levels):
+        self.viewport = viewport
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self.default_cell_size = cell_size
+        self.zoom_levels = sorted(set(zoom_levels) | {cell_size})
+        self.reset()
+
+    def reset(self):
+        """Back to the default cell size, scrolled to the top-left corner"""
+        self.cell_size = self.default_cell_size
+        self.x = 0
+        self.y = 0
+        self._clamp()
+
+    @property
+    def state(self):
+        return self.cell_size, self.x, self.y
+
+    def set_grid_size(self, grid_width, grid_height):
+        self.grid_width = grid_width
+        self.grid_height = grid_height
+        self._clamp()
+
+    @staticmethod
+    def _clamp_axis(position, grid_pixels, view_pixels):
+        if grid_pixels <= view_pixels:
+            return -((view_pixels - grid_pixels) // 2)
+        return min(max(position, 0), grid_pixels - view_pixels)
+
+    def _clamp(self):
+        self.x = self._clamp_axis(self.x, self.grid_width * self.cell_size, self.viewport.width)
+        self.y = self._clamp_axis(self.y, self.grid_height * self.cell_size, self.viewport.height)
+
+    def pan(self, dx, dy):
+        """Scroll the view by a number of screen pixels"""
+        self.x += dx
+        self.y += dy
+        self._clamp()
+
+    def zoom(self, steps, anchor):
+        """Move steps through the zoom levels, keeping the grid point under the screen position anchor in place"""
+        index = self.zoom_levels.index(self.cell_size)
+        index = min(max(index + steps, 0), len(self.zoom_levels) - 1)
+        cell_size = self.zoom_levels[index]
+        if cell_size == self.cell_size:
+            return
+        anchor_x = anchor[0] - self.viewport.x
+        anchor_y = anchor[1] - self.viewport.y
+        self.x = round((self.x + anchor_x) / self.cell_size * cell_size - anchor_x)
+        self.y = round((self.y + anchor_y) / self.cell_size * cell_size - anchor_y)
+        self.cell_size = cell_size
+        self._clamp()
+
+    def grid_rect(self):
+        """Screen rect the whole grid would cover, most of it off screen when zoomed in"""
+        return pygame.Rect(self.viewport.x - self.x, self.viewport.y - self.y,
+                           self.grid_width * self.cell_size, self.grid_height * self.cell_size)
+
+    def visible_rect(self):
+        """Screen rect of the part of the grid inside the viewport"""
+        return self.grid_rect().clip(self.viewport)
+
+    def screen_to_cell(self, pos):
+        """Grid cell under a screen position, or None outside the visible grid"""
+        if not self.visible_rect().collidepoint(pos):
+            return None
+        return ((pos[0] - self.viewport.x + self.x) // self.cell_size,
+                (pos[1] - self.viewport.y + self.y) // self.cell_size)
+
+    def cell_rect(self, x, y):
+        """Screen rect of a grid cell"""
+        return pygame.Rect(self.viewport.x - self.x + x * self.cell_size, self.viewport.y - self.y + y * self.cell_size,
+                           self.cell_size, self.cell_size)
+
+    def window(self):
+        """(x, y, columns, rows) of the block of cells to render
+
+        The block holds every visible cell, and its size only changes with the
+        zoom, so panning does not resize what the renderer has prepared.
+        """
+        columns = min(self.grid_width, self.viewport.width // self.cell_size + 2)
+        rows = min(self.grid_height, self.viewport.height // self.cell_size + 2)
+        x = min(max(self.x // self.cell_size, 0), self.grid_width - columns)
+        y = min(max(self.y // self.cell_size, 0), self.grid_height - rows)
+        return x, y, columns, rows
@@ -0,0 +1,194 @@
+import numpy as np
+import pygame
+from game.entities import Cell, Human, Vampire
+
+
+class CellRenderer:
+    """Renders a grid's cells over the checkerboard through surfarray, without a draw call per cell
+
+    Cell colours are looked up from a palette into a surface with one pixel
+    per cell, scaled up to the cell size and cut to shape by masks taken from
+    a single cell drawn the per-cell way, so the output matches drawing every
+    cell with pygame.draw. Only a window of the grid needs to be rendered.
+    """
+    PALETTE_AGES = max(Human.MAX_COLOR_AGE, Vampire.MAX_COLOR_AGE) + 1  # Colours stop changing with age here
+
+    # Labels of the pixels in a cell's shading mask
+    OUTSIDE = 0
+    BODY = 1
+    HIGHLIGHT = 2
+    SHADOW = 3
+
+    def __init__(self, config):
+        self.config = config
+        self._key = None
+        self._palettes = {}
+        self._mapped_palettes = {}
+        self._rendered = None  # Layout, palette and palette indices of the last render
+        self.changed = None  # Cells whose pixels the last render changed, or None if all may have
+
+    def _cell_labels(self, size):
+        """Label every pixel of one cell by which of the per-cell rectangles last covered it"""
+        labels = np.zeros((size, size), dtype=np.uint8)
+        if size <= 4:
+            # Too small for the inset shape, which would vanish; fill the whole cell instead
+            labels[:] = self.BODY
+            return labels
+
+        cell = pygame.Surface((size, size), pygame.SRCALPHA)
+        rect = pygame.Rect(2, 2, size - 4, size - 4)
+        pygame.draw.rect(cell, (255, 0, 0), rect, border_radius=2)
+        pygame.draw.rect(cell, (0, 255, 0), rect.inflate(-2, -2), border_radius=2)
+        pygame.draw.rect(cell, (0, 0, 255), rect.inflate(-4, -4), border_radius=2)
+
+        rgb = pygame.surfarray.array3d(cell)
+        labels[rgb[:, :, 0] == 255] = self.BODY
+        labels[rgb[:, :, 1] == 255] = self.HIGHLIGHT
+        labels[rgb[:, :, 2] == 255] = self.SHADOW
+        return labels
+
+    def _layer(self, size, rgb, alpha):
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        pygame.surfarray.pixels3d(surface)[:] = rgb
+        pygame.surfarray.pixels_alpha(surface)[:] = alpha
+        return surface
+
+    def _prepare(self, width, height, cell_size):
+        """Build the static layers and reusable surfaces for a window size and cell size"""
+        key = (width, height, cell_size)
+        if self._key == key:
+            return
+        self._key = key
+        size = (width * cell_size, height * cell_size)
+
+        # Checkerboard and grid lines never change. The board has one spare column, so a window
+        # starting on an odd cell shows it from one cell in and the checkerboard stays in place
+        xs = np.arange(size[0] + cell_size)[:, None]
+        ys = np.arange(size[1])[None, :]
+        rgb = np.zeros((size[0] + cell_size, size[1], 3), dtype=np.uint8)
+        alpha = np.zeros(rgb.shape[:2], dtype=np.uint8)
+        checker = (xs // cell_size + ys // cell_size) % 2 == 0
+        rgb[checker] = self.config.BG_COLOR
+        alpha[checker] = 50
+        # Cells are inset by two pixels, so drawing them later never covers the lines.
+        # Below four pixels per cell the lines would hide everything else
+        if cell_size >= 4:
+            lines = (xs % cell_size == 0) | (ys % cell_size == 0)
+            rgb[lines] = self.config.GRID_COLOR
+            alpha[lines] = 100
+        self.board = self._layer(rgb.shape[:2], rgb, alpha)
+
+        # Shading masks tiled over the whole window, fully transparent black outside their pixels
+        labels = np.tile(self._cell_labels(cell_size), (width, height))
+        footprint = np.where(labels != self.OUTSIDE, 255, 0)
+        body = np.where(labels == self.BODY, 255, 0)
+        self._footprint = self._layer(size, footprint[:, :, None], footprint)
+        self._body = self._layer(size, body[:, :, None], body)
+        highlight = np.where(labels == self.HIGHLIGHT, 255, 0)
+        self._shade = self._layer(size, highlight[:, :, None], np.where(labels > self.BODY, 30, 0))
+
+        # Reused every frame
+        self._colors = pygame.Surface((width, height), pygame.SRCALPHA)
+        self._occupied = pygame.Surface((width, height), pygame.SRCALPHA)
+        self._scaled_colors = pygame.Surface(size, pygame.SRCALPHA)
+        self._scaled_occupied = pygame.Surface(size, pygame.SRCALPHA)
+        self._cell_shade = pygame.Surface(size, pygame.SRCALPHA)
+        self.surface = pygame.Surface(size, pygame.SRCALPHA)
+        self._occupancy = self._map([[0, 0, 0, 0]] + [[255, 255, 255, 255]] * Cell.BUNKER)
+
+    def palette(self, is_day):
+        """RGB colour of every (cell type, age) pair, ages capped at PALETTE_AGES - 1"""
+        config = self.config
+        key = (is_day, config.HUMAN_COLOR, config.VAMPIRE_COLOR, config.FOREST_COLOR, config.BUNKER_COLOR)
+        if key not in self._palettes:
+            palette = np.zeros((Cell.BUNKER + 1, self.PALETTE_AGES, 3), dtype=np.uint8)
+            ages = np.arange(self.PALETTE_AGES)
+            palette[Cell.HUMAN] = np.array(Human.palette(config)[is_day])[np.minimum(ages, Human.MAX_COLOR_AGE)]
+            # Cells are drawn with the colour of a fed vampire
+            vampires = np.array(Vampire.palette(config)[is_day])[:, 0]
+            palette[Cell.VAMPIRE] = vampires[np.minimum(ages, Vampire.MAX_COLOR_AGE)]
+            palette[Cell.FOREST] = config.FOREST_COLOR
+            palette[Cell.BUNKER] = config.BUNKER_COLOR
+            self._palettes[key] = palette
+        return self._palettes[key]
+
+    def _map(self, rgba):
+        """Pack (..., 4) RGBA values into the pixel format of the renderer's surfaces"""
+        rgba = np.asarray(rgba, dtype=np.uint32)
+        shifts = self._colors.get_shifts()
+        return (rgba[..., 0] << shifts[0]) | (rgba[..., 1] << shifts[1]) | \
+            (rgba[..., 2] << shifts[2]) | (rgba[..., 3] << shifts[3])
+
+    def _mapped_palette(self, is_day):
+        """Flat palette of opaque mapped pixels, indexed by cell type * PALETTE_AGES + capped age"""
+        palette = self.palette(is_day)
+        key = (is_day, palette.tobytes())
+        if key not in self._mapped_palettes:
+            alpha = np.full(palette.shape[:2] + (1,), 255, dtype=np.uint8)
+            alpha[Cell.EMPTY] = 0
+            mapped = self._map(np.concatenate([palette, alpha], axis=2)).ravel()
+            mapped[:self.PALETTE_AGES] = 0  # Empty cells stay fully transparent
+            self._mapped_palettes = {key: mapped}
+        return self._mapped_palettes[key]
+
+    def changed_tiles(self, tile_size):
+        """Reduce changed to a mask of the tile_size-cell tiles of the window, or None if all may have changed"""
+        if self.changed is None:
+            return None
+        width, height = self.changed.shape
+        tiles_x = -(-width // tile_size)
+        tiles_y = -(-height // tile_size)
+        padded = np.zeros((tiles_x * tile_size, tiles_y * tile_size), dtype=bool)
+        padded[:width, :height] = self.changed
+        return padded.reshape(tiles_x, tile_size, tiles_y, tile_size).any(axis=(1, 3))
+
+    def render(self, grid, is_day, window=None, cell_size=None):
+        """Draw the board and every occupied cell, returning the reused surface
+
+        window is the (x, y, columns, rows) block of cells to draw, by default
+        the whole grid, and cell_size defaults to CELL_SIZE.
+        """
+        x, y, columns, rows = window or (0, 0, grid.width, grid.height)
+        cell_size = cell_size or self.config.CELL_SIZE
+        self._prepare(columns, rows, cell_size)
+
+        # One pixel per cell: its colour, and opaque white wherever anything is there
+        cell_types = grid.cell_types[x:x + columns, y:y + rows]
+        index = cell_types.astype(np.intp)
+        index *= self.PALETTE_AGES
+        index += np.minimum(grid.ages[x:x + columns, y:y + rows], self.PALETTE_AGES - 1)
+        palette = self._mapped_palette(is_day)
+        layout = (self._key, x, y)
+        rendered = self._rendered
+        if rendered is not None and rendered[0] == layout and rendered[1] is palette:
+            self.changed = index != rendered[2]
+        else:
+            self.changed = None
+        self._rendered = (layout, palette, index)
+        pixels = pygame.surfarray.pixels2d(self._colors)
+        np.take(palette, index, out=pixels)
+        del pixels
+        pixels = pygame.surfarray.pixels2d(self._occupied)
+        np.take(self._occupancy, cell_types, out=pixels)
+        del pixels
+        size = self.surface.get_size()
+        pygame.transform.scale(self._colors, size, self._scaled_colors)
+        pygame.transform.scale(self._occupied, size, self._scaled_occupied)
+
+        # Cut the scaled pixels to the cell shapes; everything outside them becomes zero
+        self._scaled_colors.blit(self._body, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        self._cell_shade.fill((0, 0, 0, 0))
+        self._cell_shade.blit(self._shade, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        self._cell_shade.blit(self._scaled_occupied, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+        self._scaled_occupied.blit(self._footprint, (0, 0), special_flags=pygame.BLEND_RGBA_MULT)
+
+        # Cells replace the board pixels they cover: clear those pixels, then add the cells in.
+        # Adding onto zeroed pixels copies exactly and is much cheaper than alpha blending
+        surface = self.surface
+        surface.fill((0, 0, 0, 0))
+        board_area = pygame.Rect((x + y) % 2 * cell_size, 0, *size)
+        surface.blit(self.board, (0, 0), board_area, special_flags=pygame.BLEND_RGBA_ADD)
+        surface.blit(self._scaled_occupied, (0, 0), special_flags=pygame.BLEND_RGBA_SUB)
+        surface.blit(self._scaled_colors, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        surface.blit(self._cell_shade, (0, 0), special_flags=pygame.BLEND_RGBA_ADD)
+        return surface
@@ -1,7 +1,13 @@
+import time
+from functools import partial
+import numpy as np
 import pygame
 from game.grid import Grid
 from game.simulation import Simulation
 from game.entities import Cell, Human, Vampire
+from game.replay import ReplayLog
+from ui.camera import Camera
+from ui.cell_renderer import CellRenderer
 from utils.save_load import SaveLoadManager
 from utils.resources import load_image
 
@@ -11,36 +17,95 @@ class GameScreen:
         self.config = game.config
         self.audio_manager = game.audio_manager
 
-        # Initialize grid and simulation
+        # Nothing on screen shows cycle periods, so the game skips hashing every generation
+        self.config.CYCLE_HISTORY = 0
+
+        # Initialize grid and simulation, logging the session for replay
         self.grid = Grid(self.config)
-        self.grid.random_populate()
         self.simulation = Simulation(self.grid, self.config)
+        self.replay_log = ReplayLog.start(self.config) if self.config.RECORD_REPLAYS else None
+        if self.replay_log is not None:
+            self.replay_log.attach(self.grid, self.simulation)
+        self.grid.random_populate()
 
         # Game state
-        self.paused = True
+        self._paused = True
         self.simulation_speed = self.config.DEFAULT_SIMULATION_SPEED
         self.time_since_last_step = 0
         self.drawing_mode = None
         self.hover_pos = None
 
-        # Load background images
+        # Turbo mode steps as often as the frame budget allows and measures the achieved rate
+        self.turbo = False
+        self.turbo_rate = 0
+        self._turbo_window_start = time.perf_counter()
+        self._turbo_window_generations = 0
+        self._grid_frame = None
+        self._grid_frame_generation = 0
+        self._grid_frame_key = None
+
+        # Cells are rasterized from the grid arrays over a cached checkerboard
+        self.cell_renderer = CellRenderer(self.config)
+
+        # Load background images; the tiled versions and their crossfade frames are built on first use
         self.day_bg = load_image("day.png")
         self.night_bg = load_image("night.png")
+        self._backgrounds = {}
+        self._progress_bars = {}
 
         # UI elements
         self.font = pygame.font.SysFont("Arial", 18, bold=True)
+        self.text_cache = game.text_cache
         self.save_manager = SaveLoadManager(self.config)
 
-        # Calculate grid display offset
-        self.grid_surface_width = self.config.GRID_WIDTH * self.config.CELL_SIZE
-        self.grid_surface_height = self.config.GRID_HEIGHT * self.config.CELL_SIZE
-        self.grid_x_offset = (self.config.SCREEN_WIDTH - self.grid_surface_width) // 2
-        self.grid_y_offset = (self.config.SCREEN_HEIGHT - self.grid_surface_height) // 2 - 50
+        # The grid shows through a viewport at most VIEWPORT_WIDTH x VIEWPORT_HEIGHT, zoomed and panned by a camera
+        viewport_width = min(self.config.GRID_WIDTH * self.config.CELL_SIZE, self.config.VIEWPORT_WIDTH)
+        viewport_height = min(self.config.GRID_HEIGHT * self.config.CELL_SIZE, self.config.VIEWPORT_HEIGHT)
+        self.viewport = pygame.Rect((self.config.SCREEN_WIDTH - viewport_width) // 2,
+                                    (self.config.SCREEN_HEIGHT - viewport_height) // 2 - 50,
+                                    viewport_width, viewport_height)
+        self.camera = Camera(self.viewport, self.grid.width, self.grid.height,
+                             self.config.CELL_SIZE, self.config.ZOOM_LEVELS)
+
+        # Only regions that changed are redrawn: the bounds and state each layer was last drawn with
+        self._drawn = {}
+        self._full_redraw = True
 
         # Initialize UI components
         self._init_buttons()
         self._init_colors()
 
+    @property
+    def paused(self):
+        return self._paused
+
+    @paused.setter
+    def paused(self, paused):
+        if paused != self._paused and self.replay_log is not None:
+            self.replay_log.pause(paused)
+        self._paused = paused
+
+    def load_world(self, grid, simulation):
+        """Switch to a loaded grid and simulation"""
+        if grid.UNBOUNDED:
+            print("Unbounded worlds can only be run headless (python -m game.run --unbounded)")
+            simulation.close()
+            return
+        # The replaced simulation may hold worker processes and shared memory
+        if simulation is not self.simulation:
+            self.simulation.close()
+        self.grid, self.simulation = grid, simulation
+        self._grid_frame = None
+        self.camera.set_grid_size(grid.width, grid.height)
+        if self.replay_log is not None:
+            self.replay_log.load(grid, simulation)
+
+    def close(self):
+        """Finish the replay log and release simulation resources"""
+        if self.replay_log is not None:
+            self.replay_log.close()
+        self.simulation.close()
+
     def _init_colors(self):
         self.ui_colors = {
             "bg": pygame.Color("#2E1A1A"),
@@ -73,13 +138,14 @@ class GameScreen:
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN:
+            cell = self.camera.screen_to_cell(event.pos)
             button_clicked = False
             # Check button clicks
             if self.button_areas["pause"].collidepoint(event.pos):
                 self.paused = not self.paused
                 button_clicked = True
             elif self.button_areas["step"].collidepoint(event.pos):
-                self.simulation.step()
+                self._advance(manual=True)
                 button_clicked = True
             elif self.button_areas["reset"].collidepoint(event.pos):
                 self.grid.random_populate()
@@ -90,7 +156,7 @@ class GameScreen:
             elif self.button_areas["load"].collidepoint(event.pos):
                 loaded = self.save_manager.load_game()
                 if loaded:
-                    self.grid, self.simulation = loaded
+                    self.load_world(*loaded)
                 button_clicked = True
             elif self.button_areas["forest"].collidepoint(event.pos):
                 self.drawing_mode = Cell.FOREST
@@ -107,10 +173,8 @@ class GameScreen:
                 self.audio_manager.play_sound("button_click")
 
             # Handle grid cell clicking
-            elif (self.grid_x_offset <= event.pos[0] <= self.grid_x_offset + self.grid_surface_width and
-                  self.grid_y_offset <= event.pos[1] <= self.grid_y_offset + self.grid_surface_height):
-                x = (event.pos[0] - self.grid_x_offset) // self.config.CELL_SIZE
-                y = (event.pos[1] - self.grid_y_offset) // self.config.CELL_SIZE
+            elif cell is not None:
+                x, y = cell
                 if event.button == 1:
                     if pygame.key.get_mods() & pygame.KMOD_SHIFT:
                         self.grid.set_cell(x, y, Cell.VAMPIRE)
@@ -124,22 +188,48 @@ class GameScreen:
                     self.grid.set_cell(x, y, Cell.EMPTY)
 
         elif event.type == pygame.MOUSEMOTION:
-            if event.buttons[0] and self.drawing_mode is not None:
-                if (self.grid_x_offset <= event.pos[0] <= self.grid_x_offset + self.grid_surface_width and
-                        self.grid_y_offset <= event.pos[1] <= self.grid_y_offset + self.grid_surface_height):
-                    x = (event.pos[0] - self.grid_x_offset) // self.config.CELL_SIZE
-                    y = (event.pos[1] - self.grid_y_offset) // self.config.CELL_SIZE
-                    self.grid.set_cell(x, y, self.drawing_mode)
+            self.hover_pos = event.pos
+            if event.buttons[1]:
+                # Dragging with the middle button pans the view
+                self.camera.pan(-event.rel[0], -event.rel[1])
+            elif event.buttons[0] and self.drawing_mode is not None:
+                cell = self.camera.screen_to_cell(event.pos)
+                if cell is not None:
+                    self.grid.set_cell(*cell, self.drawing_mode)
+
+        elif event.type == pygame.MOUSEWHEEL:
+            # Zoom around the cell under the mouse
+            pos = pygame.mouse.get_pos()
+            if self.viewport.collidepoint(pos):
+                self.camera.zoom(event.y, pos)
+
+        elif event.type == pygame.WINDOWLEAVE:
+            self.hover_pos = None
+
+        elif event.type == pygame.WINDOWEXPOSED:
+            # The window system lost what was on screen
+            self.invalidate()
 
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
                 self.paused = not self.paused
             elif event.key == pygame.K_RIGHT:
-                self.simulation.step()
+                self._advance(manual=True)
+            elif event.key == pygame.K_LEFT:
+                # Step back through the rewind history; pause so playback does not run forward again
+                if self.replay_log is not None:
+                    self.replay_log.seek(self.simulation.generation - 1)
+                if self.simulation.seek(self.simulation.generation - 1):
+                    self.paused = True
             elif event.key == pygame.K_UP:
                 self.simulation_speed = min(30, self.simulation_speed + 1)
             elif event.key == pygame.K_DOWN:
                 self.simulation_speed = max(1, self.simulation_speed - 1)
+            elif event.key == pygame.K_t:
+                self.turbo = not self.turbo
+                self.turbo_rate = 0
+                self._turbo_window_start = time.perf_counter()
+                self._turbo_window_generations = 0
             elif event.key == pygame.K_h:
                 self.drawing_mode = Cell.HUMAN
             elif event.key == pygame.K_v:
@@ -152,117 +242,257 @@ class GameScreen:
                 self.drawing_mode = Cell.EMPTY
             elif event.key == pygame.K_ESCAPE:
                 self.drawing_mode = None
+            elif event.key == pygame.K_HOME:
+                self.camera.reset()
 
     def update(self, dt=1 / 60):
-        if not self.paused:
-            self.time_since_last_step += dt
-            if self.time_since_last_step >= 1.0 / self.simulation_speed:
-                self.simulation.step()
-                self.time_since_last_step = 0
-        self.simulation.update(dt)
+        if self.paused:
+            return
+        if self.turbo:
+            self._update_turbo()
+            return
+
+        # Fixed timestep: run every step that fell due, but at most MAX_CATCH_UP_STEPS per frame
+        step_interval = 1.0 / self.simulation_speed
+        self.time_since_last_step += dt
+        steps = 0
+        while self.time_since_last_step >= step_interval and steps < self.config.MAX_CATCH_UP_STEPS:
+            self._advance()
+            self.time_since_last_step -= step_interval
+            steps += 1
+        if self.time_since_last_step >= step_interval:
+            # Too far behind to catch up; drop the backlog rather than spiral
+            self.time_since_last_step %= step_interval
+
+    def _advance(self, manual=False):
+        """Run one generation and move the day/night clock on by one step interval"""
+        if self.replay_log is not None:
+            self.replay_log.sync(self.simulation_speed)
+            if manual:
+                self.replay_log.step()
+        self.simulation.step()
+        self.simulation.update(1.0 / self.simulation_speed)
+        if self.replay_log is not None:
+            self.replay_log.stepped()
+
+    def _update_turbo(self):
+        """Step until the frame budget is spent; each generation advances the clock by one normal step"""
+        start = time.perf_counter()
+        deadline = start + self.config.TURBO_FRAME_BUDGET_MS / 1000
+        generations = 0
+        while True:
+            self._advance()
+            generations += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        # Average the rate over half a second so the HUD stays readable
+        self._turbo_window_generations += generations
+        elapsed = time.perf_counter() - self._turbo_window_start
+        if elapsed >= 0.5:
+            self.turbo_rate = self._turbo_window_generations / elapsed
+            self._turbo_window_start += elapsed
+            self._turbo_window_generations = 0
+
+    def invalidate(self):
+        """Redraw the whole screen on the next frame, as after another screen drew over it"""
+        self._full_redraw = True
 
     def draw(self, screen):
-        # Draw background based on day/night
-        if self.simulation.is_day:
-            self._draw_tiled_background(screen, self.day_bg, is_day=True)
-        else:
-            self._draw_tiled_background(screen, self.night_bg, is_day=False)
-
-        # Draw grid, HUD, and UI elements
-        self._draw_grid(screen)
-        self._draw_day_night_indicator(screen)
-        self._draw_population_counts(screen)
-        self._draw_simulation_speed(screen)
-        self._draw_buttons(screen)
-        self._draw_tool_indicator(screen)
-
-    def _draw_tiled_background(self, screen, bg_image, is_day=False):
-        bg_surface = pygame.Surface((self.grid_surface_width, self.grid_surface_height), pygame.SRCALPHA)
+        """Redraw the regions whose contents changed since the last frame and return their rects
+
+        Idle frames, with nothing changed, draw nothing and return an empty list.
+        """
+        dirty = self._update_grid_frame()
+        layers = self._layers()
+        for name, bounds, state, _ in layers:
+            drawn = self._drawn.get(name)
+            if drawn != (bounds, state):
+                if drawn is not None and drawn[0] != bounds:
+                    dirty.append(drawn[0])
+                dirty.append(bounds)
+                self._drawn[name] = (bounds, state)
+        if self._full_redraw:
+            self._full_redraw = False
+            dirty = [screen.get_rect()]
+        dirty = [rect for rect in dirty if rect.width and rect.height]
+
+        # Repaint each dirty region from the bottom up, with only the layers that reach into it
+        for rect in dirty:
+            screen.set_clip(rect)
+            screen.fill(self.config.BG_COLOR)
+            for _, bounds, _, draw in layers:
+                if bounds.colliderect(rect):
+                    draw(screen)
+        screen.set_clip(None)
+        return dirty
+
+    def _layers(self):
+        """Everything on the game screen in drawing order, as (name, bounds, state, draw) tuples
+
+        A layer is redrawn whenever its bounds or state differ from the last frame.
+        Changes to the cells are tracked separately, by _update_grid_frame.
+        """
+        is_day = self.simulation.is_day
+        icon_rect, bar_rect = self._day_night_rects()
+        # The progress bar's lines reach one pixel below it
+        day_night_bounds = icon_rect.union(pygame.Rect(bar_rect.x, bar_rect.y, bar_rect.width, bar_rect.height + 1))
+        layers = [
+            ("background", self.viewport, (is_day, self._background_step(), self.camera.state),
+             self._draw_tiled_background),
+            ("grid", self.viewport, None, self._draw_grid),
+            ("hover", self._hover_rect() or pygame.Rect(0, 0, 0, 0), None, self._draw_hover),
+            ("day_night", day_night_bounds, (is_day, self._day_progress_width(bar_rect.width)),
+             self._draw_day_night_indicator),
+        ]
+        for i, (x, y, color, count) in enumerate(self._counters()):
+            layers.append((f"counter_{i}", pygame.Rect(x - 10, y - 10, 160, 50), (tuple(color), count),
+                           partial(self._draw_counter, x=x, y=y, color=color, count=count)))
+        speed_text = self._speed_text()
+        text_width, text_height = self.font.size(speed_text)
+        layers.append(("speed", pygame.Rect(self.config.SCREEN_WIDTH - text_width - 30, 20, text_width, text_height),
+                       speed_text, self._draw_simulation_speed))
+        for name, rect in self.button_areas.items():
+            hovered = self.hover_pos is not None and rect.collidepoint(self.hover_pos)
+            layers.append((f"button_{name}", rect, (hovered, self._button_label(name)),
+                           partial(self._draw_button, name=name, rect=rect)))
+        tool_color = self._tool_color()
+        tool_bounds = self._tool_rect().inflate(4, 4) if self.drawing_mode else pygame.Rect(0, 0, 0, 0)
+        layers.append(("tool", tool_bounds, (self.drawing_mode, tool_color), self._draw_tool_indicator))
+        return layers
+
+    def _background_step(self):
+        """Crossfade frame due now: the background fades to the next phase's over the last BACKGROUND_FADE of each"""
+        fade = self.config.BACKGROUND_FADE
+        progress = self.simulation.day_time / self.config.DAY_DURATION
+        if fade > 0 and progress > 1 - fade:
+            return min(int((progress - (1 - fade)) / fade * self.config.BACKGROUND_FADE_STEPS),
+                       self.config.BACKGROUND_FADE_STEPS - 1)
+        return 0
+
+    def _draw_tiled_background(self, screen):
+        # The background stays put behind the part of the viewport the grid covers
+        visible = self.camera.visible_rect()
+        screen.blit(self._background(self.simulation.is_day, self._background_step()), visible.topleft,
+                    visible.move(-self.viewport.x, -self.viewport.y))
+
+    def _background(self, is_day, step=0):
+        """Cached tiled background, or a crossfade frame step / BACKGROUND_FADE_STEPS of the way to the other phase"""
+        key = (is_day, step)
+        if key not in self._backgrounds:
+            if step == 0:
+                self._backgrounds[key] = self._build_tiled_background(self.day_bg if is_day else self.night_bg, is_day)
+            else:
+                start = self._background(is_day)
+                end = self._background(not is_day)
+                weight = step / self.config.BACKGROUND_FADE_STEPS
+                frame = start.copy()
+                rgb = pygame.surfarray.pixels3d(frame)
+                rgb[:] = (pygame.surfarray.array3d(start) * (1 - weight) +
+                          pygame.surfarray.array3d(end) * weight).astype(np.uint8)
+                del rgb
+                alpha = pygame.surfarray.pixels_alpha(frame)
+                alpha[:] = (pygame.surfarray.array_alpha(start) * (1 - weight) +
+                            pygame.surfarray.array_alpha(end) * weight).astype(np.uint8)
+                del alpha
+                self._backgrounds[key] = frame
+        return self._backgrounds[key]
+
+    def _build_tiled_background(self, bg_image, is_day):
+        bg_surface = pygame.Surface(self.viewport.size, pygame.SRCALPHA)
         small_tile_size = 24
         small_bg_image = pygame.transform.scale(bg_image, (small_tile_size, small_tile_size))
         if is_day:
             brightened_image = small_bg_image.copy()
             pixel_array = pygame.surfarray.pixels3d(brightened_image)
-            import numpy as np
             brighten = np.minimum(pixel_array * 1.3, 255).astype(np.uint8)
             pixel_array[:] = brighten
             del pixel_array
             small_bg_image = brightened_image
         small_bg_image.set_alpha(178)
-        cols = self.grid_surface_width // small_tile_size + 1
-        rows = self.grid_surface_height // small_tile_size + 1
+        cols = self.viewport.width // small_tile_size + 1
+        rows = self.viewport.height // small_tile_size + 1
         for row in range(rows):
             for col in range(cols):
                 x = col * small_tile_size
                 y = row * small_tile_size
                 bg_surface.blit(small_bg_image, (x, y))
-        screen.blit(bg_surface, (self.grid_x_offset, self.grid_y_offset))
+        return bg_surface
+
+    def _update_grid_frame(self):
+        """Re-render the visible cells if they or the view changed, returning the screen rects that look different"""
+        window = self.camera.window()
+        key = (self.grid.version, self.simulation.is_day, window, self.camera.cell_size)
+        if self._grid_frame is not None and key == self._grid_frame_key:
+            return []
+        # A running turbo mode only redraws the cells every TURBO_RENDER_EVERY generations, unless the view moved
+        generation = self.simulation.generation
+        if (self._grid_frame is not None and key[2:] == self._grid_frame_key[2:] and self.turbo and
+                not self.paused and 0 <= generation - self._grid_frame_generation < self.config.TURBO_RENDER_EVERY):
+            return []
+        self._grid_frame = self._render_grid(window)
+        self._grid_frame_generation = generation
+        self._grid_frame_key = key
+
+        visible = self.camera.visible_rect()
+        tiles = self.cell_renderer.changed_tiles(self.grid.tile_size)
+        if tiles is None or tiles.sum() * 2 > tiles.size:
+            return [visible]
+        tile_pixels = self.grid.tile_size * self.camera.cell_size
+        origin = self.camera.cell_rect(window[0], window[1])
+        return [pygame.Rect(origin.x + x * tile_pixels, origin.y + y * tile_pixels,
+                            tile_pixels, tile_pixels).clip(visible)
+                for x, y in zip(*np.nonzero(tiles))]
 
     def _draw_grid(self, screen):
-        grid_surface = pygame.Surface((self.grid_surface_width, self.grid_surface_height), pygame.SRCALPHA)
-        for x in range(self.grid.width):
-            for y in range(self.grid.height):
-                rect = pygame.Rect(
-                    x * self.config.CELL_SIZE,
-                    y * self.config.CELL_SIZE,
-                    self.config.CELL_SIZE,
-                    self.config.CELL_SIZE
-                )
-                if (x + y) % 2 == 0:
-                    pygame.draw.rect(grid_surface, (*self.config.BG_COLOR, 50), rect)
-        for x in range(self.grid.width):
-            for y in range(self.grid.height):
-                cell = self.grid.cells[x][y]
-                if not cell.is_empty():
-                    rect = pygame.Rect(
-                        x * self.config.CELL_SIZE + 2,
-                        y * self.config.CELL_SIZE + 2,
-                        self.config.CELL_SIZE - 4,
-                        self.config.CELL_SIZE - 4
-                    )
-                    if cell.is_human():
-                        base_color = Human.get_color(self.config, self.simulation.is_day, cell.age)
-                    elif cell.is_vampire():
-                        base_color = Vampire.get_color(self.config, self.simulation.is_day, cell.age)
-                    elif cell.is_forest():
-                        base_color = self.config.FOREST_COLOR
-                    elif cell.is_bunker():
-                        base_color = self.config.BUNKER_COLOR
-                    pygame.draw.rect(grid_surface, base_color, rect, border_radius=2)
-                    pygame.draw.rect(grid_surface, (255, 255, 255, 30), rect.inflate(-2, -2), border_radius=2)
-                    pygame.draw.rect(grid_surface, (0, 0, 0, 30), rect.inflate(-4, -4), border_radius=2)
-        for x in range(0, self.grid_surface_width, self.config.CELL_SIZE):
-            pygame.draw.line(grid_surface, (*self.config.GRID_COLOR, 100), (x, 0), (x, self.grid_surface_height))
-        for y in range(0, self.grid_surface_height, self.config.CELL_SIZE):
-            pygame.draw.line(grid_surface, (*self.config.GRID_COLOR, 100), (0, y), (self.grid_surface_width, y))
-        screen.blit(grid_surface, (self.grid_x_offset, self.grid_y_offset))
-        if self.hover_pos and (
-                self.grid_x_offset <= self.hover_pos[0] <= self.grid_x_offset + self.grid_surface_width and
-                self.grid_y_offset <= self.hover_pos[1] <= self.grid_y_offset + self.grid_surface_height):
-            x = (self.hover_pos[0] - self.grid_x_offset) // self.config.CELL_SIZE
-            y = (self.hover_pos[1] - self.grid_y_offset) // self.config.CELL_SIZE
-            rect = pygame.Rect(
-                self.grid_x_offset + x * self.config.CELL_SIZE,
-                self.grid_y_offset + y * self.config.CELL_SIZE,
-                self.config.CELL_SIZE,
-                self.config.CELL_SIZE
-            )
-            pygame.draw.rect(screen, (255, 255, 255, 50), rect, 2)
+        # The frame holds the rendered window of cells; only the part inside the viewport is shown
+        x, y = self._grid_frame_key[2][:2]
+        frame_rect = self._grid_frame.get_rect(topleft=self.camera.cell_rect(x, y).topleft)
+        shown = frame_rect.clip(self.camera.visible_rect())
+        screen.blit(self._grid_frame, shown.topleft, shown.move(-frame_rect.x, -frame_rect.y))
 
-    def _draw_day_night_indicator(self, screen):
+    def _hover_rect(self):
+        """Outline of the cell under the mouse, cut to the viewport, or None"""
+        cell = self.camera.screen_to_cell(self.hover_pos) if self.hover_pos else None
+        if cell is None:
+            return None
+        return self.camera.cell_rect(*cell).clip(self.viewport)
+
+    def _draw_hover(self, screen):
+        cell = self.camera.screen_to_cell(self.hover_pos) if self.hover_pos else None
+        if cell is not None:
+            clip = screen.get_clip()
+            screen.set_clip(clip.clip(self.viewport))
+            pygame.draw.rect(screen, (255, 255, 255, 50), self.camera.cell_rect(*cell), 2)
+            screen.set_clip(clip)
+
+    def _render_grid(self, window):
+        return self.cell_renderer.render(self.grid, self.simulation.is_day, window, self.camera.cell_size)
+
+    def _day_night_rects(self):
+        """Rects of the sun/moon icon and of the day progress bar"""
         icon_size = 32
-        center = (self.config.SCREEN_WIDTH // 2 - 40 + icon_size // 2, 10 + icon_size // 2)
+        bar_width = 250
+        bar_height = 20
+        icon_rect = pygame.Rect(self.config.SCREEN_WIDTH // 2 - 40, 10, icon_size, icon_size)
+        bar_rect = pygame.Rect(self.config.SCREEN_WIDTH // 2 - bar_width // 2, 50, bar_width, bar_height)
+        return icon_rect, bar_rect
+
+    def _day_progress_width(self, bar_width):
+        progress = self.simulation.day_time / self.config.DAY_DURATION
+        return int(bar_width * progress)
+
+    def _draw_day_night_indicator(self, screen):
+        icon_rect, bar_rect = self._day_night_rects()
+        icon_size = icon_rect.width
+        center = icon_rect.center
         if self.simulation.is_day:
             pygame.draw.circle(screen, self.ui_colors["sun"], center, icon_size // 2)
         else:
             pygame.draw.circle(screen, self.ui_colors["moon"], center, icon_size // 2)
             pygame.draw.circle(screen, self.ui_colors["bg"], (center[0] - 5, center[1]), icon_size // 2 - 3)
-        progress = self.simulation.day_time / self.config.DAY_DURATION
-        bar_width = 250
-        bar_height = 20
-        bar_x = self.config.SCREEN_WIDTH // 2 - bar_width // 2
-        bar_y = 50
-        bar_rect = pygame.Rect(bar_x, bar_y, bar_width, bar_height)
+        bar_width = bar_rect.width
+        bar_height = bar_rect.height
         bg_color = self.ui_colors["button"]
         if isinstance(bg_color, pygame.Color):
             bg_color = (bg_color.r, bg_color.g, bg_color.b, 150)
@@ -270,65 +500,88 @@ class GameScreen:
             bg_color = (*bg_color, 150)
         pygame.draw.rect(screen, bg_color, bar_rect)
         pygame.draw.rect(screen, self.ui_colors["border"], bar_rect, 2)
-        filled_width = int(bar_width * progress)
-        filled_rect = pygame.Rect(bar_x, bar_y, filled_width, bar_height)
-        for x in range(filled_width):
-            color = self.ui_colors["sun"] if self.simulation.is_day else self.ui_colors["moon"]
-            alpha = int(255 * (x / filled_width if self.simulation.is_day else 1 - x / filled_width))
-            line_color = (*color[:3], alpha)
-            pygame.draw.line(screen, line_color, (bar_rect.x + x, bar_rect.y),
-                             (bar_rect.x + x, bar_rect.y + bar_height))
-
-    def _draw_population_counts(self, screen):
-        stats = self.grid.get_population_stats()
-        self._draw_counter(screen, 20, 20, Human.get_color(self.config, self.simulation.is_day), stats["human_count"])
-        self._draw_counter(screen, 20, 80, Vampire.get_color(self.config, self.simulation.is_day), stats["vampire_count"])
-        self._draw_counter(screen, 20, 140, self.config.FOREST_COLOR, stats["forest_count"])
-        self._draw_counter(screen, 20, 200, self.config.BUNKER_COLOR, stats["bunker_count"])
+        # The filled part is the left end of the pre-rendered full bar; its lines reach one pixel below the bar
+        filled_width = self._day_progress_width(bar_width)
+        screen.blit(self._progress_bar(self.simulation.is_day, screen), bar_rect.topleft,
+                    pygame.Rect(0, 0, filled_width, bar_height + 1))
+
+    def _progress_bar(self, is_day, screen):
+        """Completely filled day/night progress bar for a phase, drawn once in the screen's pixel format"""
+        if is_day not in self._progress_bars:
+            _, bar_rect = self._day_night_rects()
+            bar_width = bar_rect.width
+            bar_height = bar_rect.height
+            bar = pygame.Surface((bar_width, bar_height + 1), 0, screen)
+            color = self.ui_colors["sun"] if is_day else self.ui_colors["moon"]
+            for x in range(bar_width):
+                alpha = int(255 * (x / bar_width if is_day else 1 - x / bar_width))
+                line_color = (*color[:3], alpha)
+                pygame.draw.line(bar, line_color, (x, 0), (x, bar_height))
+            self._progress_bars[is_day] = bar
+        return self._progress_bars[is_day]
+
+    def _counters(self):
+        """(x, y, color, count) of each population counter"""
+        counts = self.grid.count_types()
+        return [
+            (20, 20, Human.get_color(self.config, self.simulation.is_day), counts[Cell.HUMAN]),
+            (20, 80, Vampire.get_color(self.config, self.simulation.is_day), counts[Cell.VAMPIRE]),
+            (20, 140, self.config.FOREST_COLOR, counts[Cell.FOREST]),
+            (20, 200, self.config.BUNKER_COLOR, counts[Cell.BUNKER])
+        ]
 
     def _draw_counter(self, screen, x, y, color, count):
         bg_rect = pygame.Rect(x - 10, y - 10, 160, 50)
         pygame.draw.rect(screen, self.ui_colors["button"], bg_rect, border_radius=8)
         pygame.draw.rect(screen, color, bg_rect, 2, border_radius=8)
         pygame.draw.circle(screen, color, (x + 20, y + 20), 12)
-        text = self.font.render(f"{count}", True, color)
+        text = self.text_cache.render(self.font, f"{count}", True, color)
         screen.blit(text, (x + 50, y + 8))
 
-    def _draw_buttons(self, screen):
-        for name, rect in self.button_areas.items():
-            if self.hover_pos is not None and rect.collidepoint(self.hover_pos):
-                color = self.ui_colors["button_hover"]
-            else:
-                color = self.ui_colors["button"]
-            pygame.draw.rect(screen, color, rect, border_radius=6)
-            pygame.draw.rect(screen, self.ui_colors["border"], rect, 2, border_radius=6)
-            if name == "pause":
-                text = "⏸ Pause" if not self.paused else "▶ Resume"
-            elif name == "music_toggle":
-                # Use audio_manager.is_muted to determine display text
-                text = "🎵 On" if not self.audio_manager.is_muted else "🔇 Off"
-            else:
-                text = name.capitalize()
-            text_surface = self.font.render(text, True, self.ui_colors["text"])
-            screen.blit(text_surface, (
-                rect.x + (rect.width - text_surface.get_width()) // 2,
-                rect.y + (rect.height - text_surface.get_height()) // 2
-            ))
+    def _button_label(self, name):
+        if name == "pause":
+            return "⏸ Pause" if not self.paused else "▶ Resume"
+        elif name == "music_toggle":
+            # Use audio_manager.is_muted to determine display text
+            return "🎵 On" if not self.audio_manager.is_muted else "🔇 Off"
+        return name.capitalize()
+
+    def _draw_button(self, screen, name, rect):
+        if self.hover_pos is not None and rect.collidepoint(self.hover_pos):
+            color = self.ui_colors["button_hover"]
+        else:
+            color = self.ui_colors["button"]
+        pygame.draw.rect(screen, color, rect, border_radius=6)
+        pygame.draw.rect(screen, self.ui_colors["border"], rect, 2, border_radius=6)
+        text_surface = self.text_cache.render(self.font, self._button_label(name), True, self.ui_colors["text"])
+        screen.blit(text_surface, (
+            rect.x + (rect.width - text_surface.get_width()) // 2,
+            rect.y + (rect.height - text_surface.get_height()) // 2
+        ))
+
+    def _tool_rect(self):
+        return pygame.Rect(self.config.SCREEN_WIDTH - 60, 20, 32, 32)
+
+    def _tool_color(self):
+        return {
+            Cell.HUMAN: Human.get_color(self.config, self.simulation.is_day),
+            Cell.VAMPIRE: Vampire.get_color(self.config, self.simulation.is_day),
+            Cell.FOREST: self.config.FOREST_COLOR,
+            Cell.BUNKER: self.config.BUNKER_COLOR,
+            Cell.EMPTY: (200, 200, 200)
+        }.get(self.drawing_mode, (200, 200, 200))
 
     def _draw_tool_indicator(self, screen):
         if self.drawing_mode:
-            icon_rect = pygame.Rect(self.config.SCREEN_WIDTH - 60, 20, 32, 32)
-            color = {
-                Cell.HUMAN: Human.get_color(self.config, self.simulation.is_day),
-                Cell.VAMPIRE: Vampire.get_color(self.config, self.simulation.is_day),
-                Cell.FOREST: self.config.FOREST_COLOR,
-                Cell.BUNKER: self.config.BUNKER_COLOR,
-                Cell.EMPTY: (200, 200, 200)
-            }.get(self.drawing_mode, (200, 200, 200))
-            pygame.draw.rect(screen, color, icon_rect, border_radius=4)
+            icon_rect = self._tool_rect()
+            pygame.draw.rect(screen, self._tool_color(), icon_rect, border_radius=4)
             pygame.draw.rect(screen, self.ui_colors["border"], icon_rect.inflate(4, 4), 2, border_radius=6)
 
+    def _speed_text(self):
+        if self.turbo:
+            return f"Turbo: {self.turbo_rate:.0f} gen/s"
+        return f"Speed: {self.simulation_speed}x"
+
     def _draw_simulation_speed(self, screen):
-        speed_text = f"Speed: {self.simulation_speed}x"
-        text_surface = self.font.render(speed_text, True, self.ui_colors["text"])
+        text_surface = self.text_cache.render(self.font, self._speed_text(), True, self.ui_colors["text"])
         screen.blit(text_surface, (self.config.SCREEN_WIDTH - text_surface.get_width() - 30, 20))
@@ -8,6 +8,7 @@ class SettingsMenu:
     def __init__(self, game):
         self.game = game
         self.config = game.config
+        self.text_cache = game.text_cache
 
         # Load fonts
         try:
@@ -24,7 +25,7 @@ class SettingsMenu:
             {"name": "Simulation Speed", "value": self.config.DEFAULT_SIMULATION_SPEED, "min": 1, "max": 20, "step": 1,
              "description": "How fast time flows"},
             {"name": "Day Duration (seconds)", "value": self.config.DAY_DURATION, "min": 5, "max": 30, "step": 5,
-             "description": "Length of each day/night"},
+             "description": "Length of each day/night at the set speed"},
             {"name": "Human Ratio", "value": 0.1, "min": 0.05, "max": 0.3, "step": 0.05,
              "description": "Initial % of humans"},
             {"name": "Vampire Ratio", "value": 0.05, "min": 0.01, "max": 0.2, "step": 0.01,
@@ -182,8 +183,8 @@ class SettingsMenu:
         screen.blit(self.bg_gradient, (0, 0))
 
         # Title
-        title_surface = self.title_font.render("Settings", True, (180, 0, 0))
-        title_shadow = self.title_font.render("Settings", True, (0, 0, 0))
+        title_surface = self.text_cache.render(self.title_font, "Settings", True, (180, 0, 0))
+        title_shadow = self.text_cache.render(self.title_font, "Settings", True, (0, 0, 0))
         title_x = (self.config.SCREEN_WIDTH - title_surface.get_width()) // 2
         screen.blit(title_shadow, (title_x + 2, 62))
         screen.blit(title_surface, (title_x, 60))
@@ -194,8 +195,8 @@ class SettingsMenu:
                 glow_color = (int(80 * glow_strength), 0, 0)
                 pygame.draw.rect(screen, glow_color, rect.inflate(14, 14), border_radius=12)
 
-            name_surf = self.option_font.render(setting["name"], True, (255, 255, 255))
-            desc_surf = self.info_font.render(setting["description"], True, (160, 160, 160))
+            name_surf = self.text_cache.render(self.option_font, setting["name"], True, (255, 255, 255))
+            desc_surf = self.text_cache.render(self.info_font, setting["description"], True, (160, 160, 160))
             screen.blit(name_surf, (rect.x, rect.y - 45))
             screen.blit(desc_surf, (rect.x, rect.y - 22))
 
@@ -215,14 +216,14 @@ class SettingsMenu:
             else:
                 value_text = f"{int(setting['value'])}s"
 
-            value_surface = self.option_font.render(value_text, True, (230, 230, 230))
+            value_surface = self.text_cache.render(self.option_font, value_text, True, (230, 230, 230))
             screen.blit(value_surface, (rect.right + 15, rect.y + (rect.height - value_surface.get_height()) // 2))
 
         self._draw_button(screen, self.back_button, "Back", self.selected_setting == len(self.settings))
         self._draw_button(screen, self.reset_button, "Reset", self.selected_setting == len(self.settings) + 1)
 
         hint = "← → adjust | ↑ ↓ navigate | Enter = select"
-        hint_surface = self.info_font.render(hint, True, (160, 160, 160))
+        hint_surface = self.text_cache.render(self.info_font, hint, True, (160, 160, 160))
         hint_x = (self.config.SCREEN_WIDTH - hint_surface.get_width()) // 2
         screen.blit(hint_surface, (hint_x, self.config.SCREEN_HEIGHT - 40))
 
@@ -234,7 +235,8 @@ class SettingsMenu:
 
         pygame.draw.rect(screen, (30, 0, 0), rect, border_radius=5)
         pygame.draw.rect(screen, (150, 0, 0), rect, 2, border_radius=5)
-        label_surf = self.option_font.render(label, True, (255, 100, 100) if selected else (180, 180, 180))
+        label_color = (255, 100, 100) if selected else (180, 180, 180)
+        label_surf = self.text_cache.render(self.option_font, label, True, label_color)
         label_x = rect.x + (rect.width - label_surf.get_width()) // 2
         label_y = rect.y + (rect.height - label_surf.get_height()) // 2
         screen.blit(label_surf, (label_x, label_y))
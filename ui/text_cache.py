@@ -0,0 +1,34 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """Least-recently-used cache of rendered text surfaces, keyed by (font, text, antialias, color)
+
+    Labels and HUD values repeat from frame to frame, so font.render only
+    runs when a string is drawn for the first time or after it was evicted.
+    The returned surfaces are shared and must not be modified.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def render(self, font, text, antialias, color):
+        """Same as font.render(text, antialias, color), reusing an earlier surface when there is one"""
+        key = (font, text, antialias, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, antialias, color)
+        self._surfaces[key] = surface
+        while len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
@@ -139,7 +139,7 @@ class MainMenu:
         elif index == 1:
             loaded = self.game.game_screen.save_manager.load_game()
             if loaded:
-                self.game.game_screen.grid, self.game.game_screen.simulation = loaded
+                self.game.game_screen.load_world(*loaded)
                 self.game.current_state = self.game.GAME_SCREEN
         elif index == 2:
             self.game.current_state = self.game.SETTINGS
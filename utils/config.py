@@ -4,6 +4,7 @@ class Config:
         self.SCREEN_WIDTH = 1400
         self.SCREEN_HEIGHT = 800
         self.FPS = 60
+        self.TEXT_CACHE_SIZE = 256  # Rendered text surfaces kept for reuse
 
         # Colors
         self.BG_COLOR = (25, 25, 35)  # Dark blue-ish background
@@ -20,10 +21,27 @@ class Config:
         self.GRID_WIDTH = 100
         self.GRID_HEIGHT = 80
         self.CELL_SIZE = 8
+        self.VIEWPORT_WIDTH = 1000  # Largest screen area the grid takes; larger grids are zoomed and panned
+        self.VIEWPORT_HEIGHT = 640
+        self.ZOOM_LEVELS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32)  # Cell sizes in pixels the mouse wheel steps through
+        self.TILE_SIZE = 16  # Cells per side of a dirty-tracking tile
+        self.ACTIVE_TILE_LIMIT = 0.3  # Above this fraction of dirty tiles the whole grid is stepped
+        self.CHUNK_SIZE = 64  # Cells per side of a chunk in the unbounded world
 
         # Game settings
         self.DEFAULT_SIMULATION_SPEED = 5  # Updates per second
-        self.DAY_DURATION = 10  # Seconds per day/night cycle
+        self.DAY_DURATION = 10  # Clock units per day and per night; each generation moves the clock on by 1 / speed
+        self.MAX_CATCH_UP_STEPS = 5  # Most overdue steps run in one frame; older backlog is dropped
+        self.SIMULATION_ENGINE = "numpy"  # "python" (per-cell reference), "numpy" (vectorized), "parallel" or "bitplane"
+        self.SIMULATION_WORKERS = 4  # Worker processes for the parallel engine
+        self.STRIP_ORIENTATION = "vertical"  # Parallel engine splits the torus into "vertical" or "horizontal" strips
+        self.CYCLE_HISTORY = 64  # State hashes kept for still life and cycle detection (0 disables it)
+        self.HISTORY_KEYFRAME_INTERVAL = 50  # Generations between full snapshots in the rewind history
+        self.HISTORY_MEMORY_LIMIT = 16 * 1024 * 1024  # Bytes of compressed rewind history kept (0 disables it)
+        self.BACKGROUND_FADE = 0.1  # Share of each day/night phase at its end spent fading to the next background
+        self.BACKGROUND_FADE_STEPS = 8  # Precomputed crossfade frames
+        self.TURBO_FRAME_BUDGET_MS = 12  # Milliseconds of stepping per frame in turbo mode
+        self.TURBO_RENDER_EVERY = 10  # Turbo mode redraws the cells once per this many generations
 
         # Audio Configuration
         self.MUSIC_VOLUME = 0.5  # Range: 0.0 to 1.0
@@ -91,4 +109,7 @@ class Config:
         }
 
         # Save/load
-        self.SAVE_FOLDER = "saves/"
\ No newline at end of file
+        self.SAVE_FOLDER = "saves/"
+        self.RECORD_REPLAYS = True  # Log every session for exact headless replay (python -m game.run --replay)
+        self.REPLAY_FOLDER = "replays/"
+        self.REPLAY_SYNC_INTERVAL = 100  # Generations between grid checksums in a replay log
\ No newline at end of file
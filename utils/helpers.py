@@ -1,4 +1,5 @@
 import random
+import numpy as np
 from game.entities import Cell
 
 
@@ -90,11 +91,7 @@ def create_balancing_event(grid, simulation):
 
 def is_extinct(grid, cell_type):
     """Check if a species is extinct"""
-    for x in range(grid.width):
-        for y in range(grid.height):
-            if grid.cells[x][y].cell_type == cell_type:
-                return False
-    return True
+    return grid.count_types()[cell_type] == 0
 
 
 def is_stagnant(grid, previous_state, threshold=0.98):
@@ -102,15 +99,13 @@ def is_stagnant(grid, previous_state, threshold=0.98):
     if previous_state is None:
         return False
 
-    same_count = 0
+    # Compare the cells both states cover, as (x, y) cell types
+    previous_state = np.asarray(previous_state)
+    width = min(previous_state.shape[0], grid.width)
+    height = min(previous_state.shape[1], grid.height)
+    same_count = np.count_nonzero(previous_state[:width, :height] == grid.cell_types[:width, :height])
     total_count = grid.width * grid.height
 
-    for x in range(grid.width):
-        for y in range(grid.height):
-            if x < len(previous_state) and y < len(previous_state[0]):
-                if grid.cells[x][y].cell_type == previous_state[x][y]:
-                    same_count += 1
-
     return same_count / total_count >= threshold
 
 
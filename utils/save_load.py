@@ -2,6 +2,7 @@ import os
 import json
 import datetime
 from game.grid import Grid
+from game.chunked_grid import ChunkedGrid
 from game.simulation import Simulation
 
 
@@ -12,24 +13,27 @@ class SaveLoadManager:
         # Create save directory if it doesn't exist
         os.makedirs(self.config.SAVE_FOLDER, exist_ok=True)
 
-    def save_game(self, grid, simulation):
+    def save_game(self, grid, simulation, filename=None):
         """Save the current game state to a file"""
         try:
             # Create save data
             save_data = {
                 "grid_state": grid.get_serialized_state(),
+                "unbounded": grid.UNBOUNDED,
                 "is_day": simulation.is_day,
                 "day_time": simulation.day_time,
-                "vampire_hunger": simulation.vampire_hunger,
+                # Unbounded worlds store hunger inside their serialized chunks
+                "vampire_hunger": None if grid.UNBOUNDED else simulation.vampire_hunger.tolist(),
                 "metadata": {
                     "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                     "statistics": simulation.get_statistics()
                 }
             }
 
-            # Generate filename with timestamp
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"vampire_city_save_{timestamp}.json"
+            # Generate filename with timestamp unless one was given
+            if filename is None:
+                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+                filename = f"vampire_city_save_{timestamp}.json"
             filepath = os.path.join(self.config.SAVE_FOLDER, filename)
 
             # Save to file
@@ -61,17 +65,18 @@ class SaveLoadManager:
             with open(filepath, 'r') as f:
                 save_data = json.load(f)
 
-            # Create new grid and load saved state
-            grid = Grid(self.config)
+            # Create new grid and load saved state; unbounded worlds save their chunks as a dict
+            unbounded = save_data.get("unbounded") or isinstance(save_data["grid_state"], dict)
+            grid = ChunkedGrid(self.config) if unbounded else Grid(self.config)
             grid.load_from_serialized(save_data["grid_state"])
 
-            # Create new simulation and set state
-            simulation = Simulation(grid, self.config)
+            # Create new simulation and set state (unbounded worlds only step with numpy)
+            simulation = Simulation(grid, self.config, engine="numpy" if unbounded else None)
             simulation.is_day = save_data["is_day"]
             simulation.day_time = save_data["day_time"]
 
-            # Load vampire hunger if available (for backwards compatibility)
-            if "vampire_hunger" in save_data:
+            # Load vampire hunger if available (for backwards compatibility; chunks carry their own)
+            if save_data.get("vampire_hunger") is not None:
                 simulation.vampire_hunger = save_data["vampire_hunger"]
 
             print(f"Game loaded from {filename}")